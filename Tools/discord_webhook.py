@@ -8,30 +8,51 @@ Requirements: pip install requests watchdog
 Usage:
     python discord_webhook.py [--config config.json]
     python discord_webhook.py --test
+    python discord_webhook.py --async
+    python discord_webhook.py --benchmark-parser [MB ...]
 
 Configuration:
     Create config.json with:
     {
         "savedvariables_path": "C:\\Path\\To\\WoW\\_retail_\\WTF\\Account\\ACCOUNT\\SavedVariables\\CelestialRecruiterDB.lua",
         "webhook_url": "https://discord.com/api/webhooks/YOUR_WEBHOOK_URL",
-        "check_interval": 5,
-        "rate_limit_delay": 2
+        "check_interval": 5
     }
 """
 
+import asyncio
+import bisect
+import csv
+import gc
+import glob
+import hashlib
+import io
 import json
 import os
 import sys
 import time
 import re
 import logging
+import mmap
+import pickle
+import random
+import sqlite3
+import tempfile
+import threading
 from pathlib import Path
+from queue import Empty, Full, Queue
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Any
-from collections import deque
+from urllib.parse import urlsplit
+from typing import Dict, List, Optional, Any, Iterator, Iterable, Union
+from collections import Counter
+from collections.abc import Mapping
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait as wait_futures
+from contextlib import contextmanager
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.exceptions import NewConnectionError
 except ImportError:
     print("ERROR: requests library not installed")
     print("Install it with: pip install requests")
@@ -60,209 +81,1409 @@ logger = logging.getLogger(__name__)
 
 
 class DiscordRateLimiter:
-    """Rate limiter for Discord webhooks (30 requests per 60 seconds)"""
-
-    def __init__(self, max_requests: int = 30, window_seconds: int = 60):
-        self.max_requests = max_requests
-        self.window_seconds = window_seconds
-        self.request_times = deque()
-
-    def wait_if_needed(self) -> bool:
-        """Block if rate limit would be exceeded. Returns True if OK to proceed."""
+    """Rate limiter for Discord webhooks, driven by the X-RateLimit-* headers.
+
+    Each route (method + webhook) is mapped to the bucket Discord reports for
+    it. A bucket with no requests left holds its routes until the reported
+    reset, a global 429 holds every route, and an unknown route goes straight
+    through until its first response tells us its bucket.
+
+    The last `reserved` requests of each bucket window are kept for priority
+    requests, so an alert never waits behind a burst of routine messages.
+    """
+
+    def __init__(self, max_retries: int = 5, backoff_base: float = 0.5, backoff_max: float = 30,
+                 name: str = 'Discord', reserved: int = 1):
+        self.name = name
+        self.reserved = reserved
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.routes: Dict[str, str] = {}                # route -> bucket id
+        self.buckets: Dict[str, Dict[str, float]] = {}  # bucket id -> limit/remaining/reset_at/window
+        self.global_until = 0.0
+        self.stats = {'requests': 0, 'waits': 0, 'rate_limited': 0, 'retries': 0}
+        self._lock = threading.Lock()  # Message edits reserve slots from a background thread
+
+    def _delay(self, route: str, now: float, priority: bool = False) -> float:
+        if self.global_until > now:
+            return self.global_until - now
+        bucket = self.buckets.get(self.routes.get(route, route))
+        if bucket is None:
+            return 0
+        if bucket['reset_at'] <= now:
+            # New window; its reset is estimated until a response reports it
+            bucket['remaining'] = bucket['limit']
+            bucket['reset_at'] = now + bucket['window']
+        # Never reserve a bucket's only request
+        floor = 0 if priority else min(self.reserved, bucket['limit'] - 1)
+        return bucket['reset_at'] - now if bucket['remaining'] <= floor else 0
+
+    def delay(self, route: str, priority: bool = False) -> float:
+        """Seconds until `route` may send, without reserving anything"""
+        with self._lock:
+            return min(self._delay(route, time.monotonic(), priority), self.backoff_max)
+
+    def _reserve(self, route: str, priority: bool = False) -> float:
+        """Take a request from the route's bucket (returns 0), else return how long to wait"""
+        with self._lock:
+            wait = self._delay(route, time.monotonic(), priority)
+            if wait:
+                return min(wait, self.backoff_max)
+            bucket = self.buckets.get(self.routes.get(route, route))
+            if bucket is not None:
+                bucket['remaining'] -= 1
+            self.stats['requests'] += 1
+            return 0
+
+    def wait_if_needed(self, route: str = '', priority: bool = False) -> bool:
+        """Block until the route's bucket has a free slot (including the
+        reserved ones for a priority request). Returns True if OK to proceed."""
         for _ in range(10):  # Max 10 retries
-            now = time.time()
-
-            # Remove old requests outside the window
-            while self.request_times and self.request_times[0] < now - self.window_seconds:
-                self.request_times.popleft()
-
-            # If at limit, wait until oldest request expires
-            if len(self.request_times) >= self.max_requests:
-                sleep_time = self.window_seconds - (now - self.request_times[0]) + 0.1
-                if sleep_time > 0:
-                    logger.warning(f"Rate limit reached, waiting {sleep_time:.1f}s")
-                    time.sleep(sleep_time)
-                    continue  # Re-check after sleep
-
-            # Slot available — record this request and proceed
-            self.request_times.append(time.time())
-            return True
+            sleep_time = self._reserve(route, priority)
+            if not sleep_time:
+                return True
+            self.stats['waits'] += 1
+            logger.debug(f"Rate limit: waiting {sleep_time:.2f}s for {route}")
+            time.sleep(sleep_time)  # Scheduled for the bucket reset
 
         # Exhausted retries without finding a slot
         logger.error("Rate limit: exhausted retries, skipping request")
         return False
 
+    async def wait_async(self, route: str = '', priority: bool = False):
+        """Suspend the calling task until the route's bucket has a free slot"""
+        sleep_time = self.delay(route, priority)
+        while sleep_time:
+            await asyncio.sleep(sleep_time)
+            sleep_time = self.delay(route, priority)
+
+    def update(self, route: str, response: requests.Response) -> float:
+        """Record the rate-limit headers of a response. Returns the delay
+        Discord asked for on 429, else 0."""
+        headers = response.headers
+        now = time.monotonic()
+        retry_after = 0.0
+        with self._lock:
+            bucket_id = headers.get('X-RateLimit-Bucket')
+            if bucket_id:
+                self.routes[route] = bucket_id
+            bucket_id = self.routes.get(route, route)
+            if 'X-RateLimit-Remaining' in headers:
+                remaining = int(headers['X-RateLimit-Remaining'])
+                reset_after = float(headers.get('X-RateLimit-Reset-After', 0))
+                bucket = self.buckets.get(bucket_id)
+                if bucket is not None and abs(bucket['reset_at'] - (now + reset_after)) < 0.5:
+                    remaining = min(remaining, bucket['remaining'])  # Same window: keep in-flight reservations
+                self.buckets[bucket_id] = {
+                    'limit': int(headers.get('X-RateLimit-Limit', remaining + 1)),
+                    'remaining': remaining,
+                    'reset_at': now + reset_after,
+                    'window': max(reset_after, bucket['window'] if bucket else 0),
+                }
+            if response.status_code == 429:
+                self.stats['rate_limited'] += 1
+                try:
+                    body = response.json()
+                except ValueError:
+                    body = {}  # Cloudflare ban page
+                retry_after = float(body.get('retry_after') or headers.get('Retry-After') or 5)
+                if body.get('global') or headers.get('X-RateLimit-Global') == 'true' \
+                        or headers.get('X-RateLimit-Scope') == 'global':
+                    self.global_until = max(self.global_until, now + retry_after)
+                else:
+                    bucket = self.buckets.setdefault(
+                        bucket_id, {'limit': 1, 'remaining': 0, 'reset_at': 0, 'window': retry_after})
+                    bucket['remaining'] = 0
+                    bucket['reset_at'] = max(bucket['reset_at'], now + retry_after)
+        return retry_after
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for retry number `attempt` (0-based)"""
+        self.stats['retries'] += 1
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def log_stats(self):
+        s = self.stats
+        logger.info(
+            f"{self.name} rate limits: {s['requests']} requests, {s['waits']} waits for a bucket reset, "
+            f"{s['rate_limited']} rate limited (429), {s['retries']} retries"
+        )
+
+
+@contextmanager
+def gc_paused():
+    """Suspend the cyclic GC while building large parse trees. Parsed tables
+    hold no reference cycles, so collection passes are pure overhead that
+    grows with the number of live objects."""
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+@contextmanager
+def mapped_file(path: Union[str, Path]):
+    """Memory-map a file read-only. Pages are loaded by the OS on access, so
+    scanning the mapping does not copy the file into process memory."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            yield buf
+
+
+class LuaTokenizer:
+    """Token stream over Lua source (SavedVariables subset).
+
+    Every pattern is precompiled and matched in place with
+    ``pattern.match(content, pos)``, so scanning never copies the remainder
+    of the file. Tokens are ``(kind, text, start, end)`` tuples where kind is
+    one of ``string``, ``number``, ``field`` (``name =``), ``name``,
+    ``punct`` or ``other``.
+    """
+
+    # Whitespace and line comments (WoW writes `-- [n]` after array items)
+    SKIP_RE = re.compile(r'(?:\s+|--[^\n]*)*')
+    TOKEN_RE = re.compile(r'''
+        (?P<string>"[^"\\]*(?:\\.[^"\\]*)*"|'[^'\\]*(?:\\.[^'\\]*)*')
+      | (?P<number>-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)
+      | (?P<field>(?P<fieldname>[A-Za-z_][A-Za-z0-9_]*)\s*=(?!=))
+      | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<punct>[{}\[\]=,;])
+      | (?P<other>.)
+    ''', re.VERBOSE | re.DOTALL)
+
+    __slots__ = ('content', 'pos', 'end', '_peeked')
+
+    def __init__(self, content: str, pos: int = 0, end: Optional[int] = None):
+        self.content = content
+        self.pos = pos
+        self.end = len(content) if end is None else end
+        self._peeked = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> tuple:
+        tok = self.next_token()
+        if tok is None:
+            raise StopIteration
+        return tok
+
+    def next_token(self) -> Optional[tuple]:
+        """Return the next token, or None at end of input"""
+        if self._peeked is not None:
+            tok, self._peeked = self._peeked, None
+            return tok
+        pos = self.SKIP_RE.match(self.content, self.pos, self.end).end()
+        if pos >= self.end:
+            self.pos = pos
+            return None
+        m = self.TOKEN_RE.match(self.content, pos, self.end)
+        kind = m.lastgroup
+        self.pos = m.end()
+        text = m.group('fieldname') if kind == 'field' else m.group()
+        return kind, text, pos, self.pos
+
+    def peek(self) -> Optional[tuple]:
+        """Return the next token without consuming it"""
+        if self._peeked is None:
+            self._peeked = self.next_token()
+        return self._peeked
+
 
 class LuaParser:
-    """Lua table parser for SavedVariables — with targeted queue extraction"""
+    """Lua table parser for SavedVariables — with targeted queue extraction.
+
+    Built on LuaTokenizer: parsing cost is linear in the size of the input.
+    """
+
+    KEYWORDS = {'true': True, 'false': False, 'nil': None}
+    ESCAPES = {'n': '\n', 't': '\t'}
+    ESCAPE_RE = re.compile(r'\\(.)', re.DOTALL)
+    QUEUE_RE = re.compile(r'\["discordQueue"\]\s*=\s*\{')
+    QUEUE_BYTES_RE = re.compile(QUEUE_RE.pattern.encode())
+    # Braces outside strings and comments, for skipping whole tables
+    BRACE_RE = re.compile(r'''
+        "[^"\\]*(?:\\.[^"\\]*)*"|'[^'\\]*(?:\\.[^'\\]*)*'|--[^\n]*
+      | (?P<open>\{) | (?P<close>\})
+    ''', re.VERBOSE | re.DOTALL)
+    # Same scan over raw bytes / mmap (quotes and braces never occur
+    # inside UTF-8 multi-byte sequences)
+    BRACE_BYTES_RE = re.compile(BRACE_RE.pattern.encode(), re.VERBOSE | re.DOTALL)
 
     @staticmethod
-    def parse_value(content: str, pos: int) -> tuple:
-        """Parse a Lua value starting at position pos"""
-        # Skip whitespace and comments
-        while pos < len(content):
-            if content[pos].isspace():
-                pos += 1
-            elif content[pos:pos+2] == '--':
-                # Skip comment line
-                while pos < len(content) and content[pos] != '\n':
-                    pos += 1
-            else:
+    def _unquote(text: str) -> str:
+        body = text[1:-1]
+        if '\\' not in body:
+            return body
+        return LuaParser.ESCAPE_RE.sub(
+            lambda m: LuaParser.ESCAPES.get(m.group(1), m.group(1)), body)
+
+    @staticmethod
+    def _read_value(tokens: LuaTokenizer, tok: Optional[tuple]) -> tuple:
+        """Build the value that starts with token tok"""
+        if tok is None:
+            return None, tokens.pos
+        kind, text, _, end = tok
+        if kind == 'string':
+            return LuaParser._unquote(text), end
+        if kind == 'number':
+            if '.' in text or 'e' in text or 'E' in text:
+                return float(text), end
+            return int(text), end
+        if kind == 'name':
+            return LuaParser.KEYWORDS.get(text), end
+        if text == '{' and kind == 'punct':
+            return LuaParser._read_table(tokens, end)
+        # Unknown
+        return None, end
+
+    @staticmethod
+    def _read_table(tokens: LuaTokenizer, pos: int) -> tuple:
+        """Build a table whose opening '{' has already been consumed"""
+        table = {}
+        array = []
+        read_value = LuaParser._read_value
+        next_token = tokens.next_token
+
+        while True:
+            tok = next_token()
+            if tok is None:
+                pos = tokens.pos
                 break
+            kind, text, _, pos = tok
 
-        if pos >= len(content):
-            return None, pos
+            if kind == 'punct':
+                if text == '}':
+                    break
+                if text == ',' or text == ';':
+                    continue
+                if text == '[':
+                    # Explicit key: [key] = value
+                    key, pos = read_value(tokens, next_token())
+                    # Skip to '='
+                    tok = next_token()
+                    while tok is not None and tok[1] != '=':
+                        tok = next_token()
+                    value, pos = read_value(tokens, next_token())
+                    table[key] = value
+                    continue
+            elif kind == 'field':
+                # Named key: key = value
+                value, pos = read_value(tokens, next_token())
+                table[text] = value
+                continue
 
-        # String (double or single quoted)
-        if content[pos] in ('"', "'"):
-            quote = content[pos]
-            pos += 1
-            value = []
-            while pos < len(content) and content[pos] != quote:
-                if content[pos] == '\\' and pos + 1 < len(content):
-                    next_char = content[pos + 1]
-                    if next_char == 'n':
-                        value.append('\n')
-                    elif next_char == 't':
-                        value.append('\t')
-                    elif next_char == '\\':
-                        value.append('\\')
-                    elif next_char == quote:
-                        value.append(quote)
-                    else:
-                        value.append(next_char)
-                    pos += 2
-                else:
-                    value.append(content[pos])
-                    pos += 1
-            return ''.join(value), pos + 1
-
-        # Number
-        if content[pos].isdigit() or content[pos] == '-':
-            match = re.match(r'-?\d+(?:\.\d+)?', content[pos:])
-            if match:
-                num_str = match.group()
-                value = float(num_str) if '.' in num_str else int(num_str)
-                return value, pos + len(num_str)
-
-        # Boolean
-        if content[pos:pos+4] == 'true':
-            return True, pos + 4
-        if content[pos:pos+5] == 'false':
-            return False, pos + 5
-
-        # nil
-        if content[pos:pos+3] == 'nil':
-            return None, pos + 3
-
-        # Table
-        if content[pos] == '{':
-            return LuaParser.parse_table(content, pos)
+            # Array element
+            value, pos = read_value(tokens, tok)
+            array.append(value)
 
-        # Unknown
-        return None, pos + 1
+        return (array if not table else table), pos
+
+    @staticmethod
+    def find_table_end(content: Union[str, bytes, mmap.mmap], pos: int) -> int:
+        """Return the position just past the '}' matching the '{' at pos
+        (works on text as well as raw bytes or a memory map)"""
+        brace_re = LuaParser.BRACE_RE if isinstance(content, str) else LuaParser.BRACE_BYTES_RE
+        depth = 0
+        for m in brace_re.finditer(content, pos):
+            kind = m.lastgroup
+            if kind == 'open':
+                depth += 1
+            elif kind == 'close':
+                depth -= 1
+                if depth == 0:
+                    return m.end()
+        return len(content)
+
+    @staticmethod
+    def item_spans(content: str, pos: int) -> List[tuple]:
+        """(start, end) spans of the tables directly inside the table at pos"""
+        spans = []
+        depth = 0
+        item_start = 0
+        for m in LuaParser.BRACE_RE.finditer(content, pos):
+            kind = m.lastgroup
+            if kind == 'open':
+                depth += 1
+                if depth == 2:
+                    item_start = m.start()
+            elif kind == 'close':
+                depth -= 1
+                if depth == 1:
+                    spans.append((item_start, m.end()))
+                elif depth == 0:
+                    break
+        return spans
+
+    @staticmethod
+    def parse_value(content: str, pos: int) -> tuple:
+        """Parse a Lua value starting at position pos"""
+        tokens = LuaTokenizer(content, pos)
+        return LuaParser._read_value(tokens, tokens.next_token())
 
     @staticmethod
     def parse_table(content: str, pos: int) -> tuple:
         """Parse a Lua table starting at position pos"""
         if content[pos] != '{':
             return None, pos
+        return LuaParser._read_table(LuaTokenizer(content, pos + 1), pos + 1)
 
-        pos += 1  # Skip '{'
-        table = {}
-        array = []
-        is_array = True
-
-        while pos < len(content):
-            # Skip whitespace and comments
-            while pos < len(content):
-                if content[pos].isspace():
-                    pos += 1
-                elif content[pos:pos+2] == '--':
-                    while pos < len(content) and content[pos] != '\n':
-                        pos += 1
-                else:
-                    break
+    @staticmethod
+    def _iter_entries(tokens: LuaTokenizer) -> Iterator[tuple]:
+        """Yield (key, first value token) for each entry of the table whose
+        '{' was consumed. The caller consumes the value before resuming."""
+        next_token = tokens.next_token
+        index = 0
+        while True:
+            tok = next_token()
+            if tok is None:
+                return
+            kind, text, _, _ = tok
+            if kind == 'punct':
+                if text == '}':
+                    return
+                if text == ',' or text == ';':
+                    continue
+                if text == '[':
+                    key, _ = LuaParser._read_value(tokens, next_token())
+                    tok = next_token()
+                    while tok is not None and tok[1] != '=':
+                        tok = next_token()
+                    yield key, next_token()
+                    continue
+            elif kind == 'field':
+                yield text, next_token()
+                continue
+            # Array element (Lua arrays are 1-based)
+            index += 1
+            yield index, tok
 
-            if pos >= len(content):
-                break
+    # ── streaming events ────────────────────────────────────────────
 
-            # End of table
-            if content[pos] == '}':
-                pos += 1
-                break
+    @staticmethod
+    def _match_path(path: tuple, segments: tuple) -> Optional[str]:
+        """'match' if path is at or below a filter match, 'prefix' if a match
+        may still lie below it, None if the subtree can be skipped"""
+        for key, segment in zip(path, segments):
+            if segment != '*' and segment != str(key):
+                return None
+        return 'match' if len(path) >= len(segments) else 'prefix'
 
-            # Key-value pair
-            if content[pos] == '[':
-                # Explicit key: [key] = value
-                pos += 1
-                key, pos = LuaParser.parse_value(content, pos)
-                # Skip to '='
-                while pos < len(content) and content[pos] != '=':
-                    pos += 1
-                pos += 1  # Skip '='
-                value, pos = LuaParser.parse_value(content, pos)
-                table[key] = value
-                is_array = False
-            elif re.match(r'[a-zA-Z_][a-zA-Z0-9_]*\s*=', content[pos:]):
-                # Named key: key = value
-                match = re.match(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*=', content[pos:])
-                key = match.group(1)
-                pos += match.end()
-                value, pos = LuaParser.parse_value(content, pos)
-                table[key] = value
-                is_array = False
-            else:
-                # Array element
-                value, pos = LuaParser.parse_value(content, pos)
-                array.append(value)
+    @staticmethod
+    def _node_events(tokens: LuaTokenizer, tok: Optional[tuple], path: tuple,
+                     segments: Optional[tuple], matched: bool) -> Iterator[tuple]:
+        if tok is None:
+            return
+        is_table = tok[0] == 'punct' and tok[1] == '{'
+        if not matched:
+            state = LuaParser._match_path(path, segments)
+            if state is None:
+                if is_table:
+                    tokens.pos = LuaParser.find_table_end(tokens.content, tok[2])
+                return
+            matched = state == 'match'
 
-            # Skip comma
-            while pos < len(content) and content[pos] in (',', ';', '\n', ' ', '\t'):
-                pos += 1
+        if not is_table:
+            if matched:
+                yield 'value', path, LuaParser._read_value(tokens, tok)[0]
+            return
 
-        return (array if is_array and not table else table), pos
+        if matched:
+            yield 'start', path, None
+        for key, tok in LuaParser._iter_entries(tokens):
+            yield from LuaParser._node_events(tokens, tok, path + (key,), segments, matched)
+        if matched:
+            yield 'end', path, None
 
     @staticmethod
-    def extract_discord_queue(content: str) -> list:
-        """Fast extraction: find discordQueue section and parse only that.
-        Avoids parsing the entire multi-MB SavedVariables file."""
-        # Find the discordQueue key
-        pattern = re.compile(r'\["discordQueue"\]\s*=\s*\{')
-        match = pattern.search(content)
-        if not match:
-            return []
+    def iter_events(content: str, path_filter: Optional[str] = None) -> Iterator[tuple]:
+        """Stream a SavedVariables file as (kind, path, value) events.
+
+        kind is 'start' / 'end' around a table and 'value' for a scalar; path
+        is a tuple starting with the top-level variable name, array items use
+        their 1-based index. path_filter is a dotted pattern where '*' matches
+        any single key, e.g. '*.global.contacts.*.status'. Only matching nodes
+        (and everything below them) produce events; other subtrees are skipped
+        without being parsed, so aggregating over the DB needs no tree.
+        """
+        segments = tuple(path_filter.split('.')) if path_filter else None
+        tokens = LuaTokenizer(content)
+        for kind, text, _, _ in tokens:
+            if kind == 'field':
+                yield from LuaParser._node_events(
+                    tokens, tokens.next_token(), (text,), segments, segments is None)
+
+    @staticmethod
+    def iter_table_events(content: str, pos: int, path: tuple = (),
+                          path_filter: Optional[str] = None) -> Iterator[tuple]:
+        """Stream the single table at pos (see iter_events), rooted at path"""
+        segments = tuple(path_filter.split('.')) if path_filter else None
+        tokens = LuaTokenizer(content, pos)
+        yield from LuaParser._node_events(
+            tokens, tokens.next_token(), path, segments, segments is None)
 
-        # Position of the opening '{' for the queue table
+    @staticmethod
+    def collect(events: Iterable[tuple]) -> Iterator[tuple]:
+        """Rebuild values from an event stream: yield (path, value) for each
+        outermost node. Tables keyed 1..n become lists, like parse_table."""
+        stack = []
+        for kind, path, value in events:
+            if kind == 'start':
+                stack.append({})
+                continue
+            if kind == 'end':
+                value = stack.pop()
+                if not value or list(value) == list(range(1, len(value) + 1)):
+                    value = list(value.values())
+            if stack:
+                stack[-1][path[-1]] = value
+            else:
+                yield path, value
+
+    @staticmethod
+    def find_queue_span(buf: Union[bytes, mmap.mmap], hint: int = -1) -> Optional[tuple]:
+        """Locate the discordQueue table in raw bytes: (offset of the key,
+        start of '{', end). A hint (key offset from a previous read) is
+        tried first, which avoids searching the file when the queue has
+        not moved."""
+        match = LuaParser.QUEUE_BYTES_RE.match(buf, hint) if hint >= 0 else None
+        if not match:
+            match = LuaParser.QUEUE_BYTES_RE.search(buf)
+            if not match:
+                return None
         brace_start = match.end() - 1
+        return match.start(), brace_start, LuaParser.find_table_end(buf, brace_start)
+
+    @staticmethod
+    def extract_discord_queue(content: Union[str, bytes, mmap.mmap]) -> list:
+        """Fast extraction: find discordQueue section and parse only that.
+        Avoids parsing the entire multi-MB SavedVariables file. Raw bytes or
+        a memory map are scanned undecoded; only the queue is decoded."""
+        if isinstance(content, str):
+            match = LuaParser.QUEUE_RE.search(content)
+            if not match:
+                return []
+            brace_start = match.end() - 1
+        else:
+            span = LuaParser.find_queue_span(content)
+            if span is None:
+                return []
+            content = str(content[span[1]:span[2]], 'utf-8')
+            brace_start = 0
+
+        # Stream the items of the queue table
         try:
-            result, _ = LuaParser.parse_table(content, brace_start)
-            if isinstance(result, list):
-                return result
-            elif isinstance(result, dict):
-                # Shouldn't happen for an array, but handle gracefully
-                return list(result.values())
-            return []
+            events = LuaParser.iter_table_events(
+                content, brace_start, ('discordQueue',), 'discordQueue.*')
+            return [value for _, value in LuaParser.collect(events)]
         except Exception as e:
             logger.error(f"Failed to parse discordQueue: {e}")
             return []
 
     @staticmethod
-    def parse_savedvariables(content: str) -> Dict[str, Any]:
-        """Parse WoW SavedVariables file (full parse — use extract_discord_queue for speed)"""
+    def parse_file(path: Union[str, Path], workers: int = 1) -> Dict[str, Any]:
+        """Full parse of a SavedVariables file, decoded straight from a memory map"""
+        with mapped_file(path) as buf:
+            if workers > 1:
+                return LuaParser.parse_savedvariables_parallel(str(buf, 'utf-8'), workers)
+            return LuaParser.parse_savedvariables(buf)
+
+    # ── parallel full parse ─────────────────────────────────────────
+
+    # Tables are split into their entries at most this deep below a
+    # top-level variable (CelestialRecruiterDB -> global -> contacts -> entry)
+    SPLIT_DEPTH = 3
+
+    @staticmethod
+    def _entry_spans(content: str, start: int) -> List[tuple]:
+        """(key, value start, value end, is_table) for each entry of the table
+        at start, without parsing nested tables"""
+        spans = []
+        tokens = LuaTokenizer(content, start + 1)
+        for key, tok in LuaParser._iter_entries(tokens):
+            if tok is None:
+                break
+            if tok[0] == 'punct' and tok[1] == '{':
+                tokens.pos = LuaParser.find_table_end(content, tok[2])
+                spans.append((key, tok[2], tokens.pos, True))
+            else:
+                LuaParser._read_value(tokens, tok)
+                spans.append((key, tok[2], tokens.pos, False))
+        return spans
+
+    @staticmethod
+    def parse_savedvariables_parallel(content: str, workers: int) -> Dict[str, Any]:
+        """Full parse split across a process pool.
+
+        One pass lists the entries of each top-level table; tables too large
+        for a single job (typically global, then contacts/logs) are split
+        into their own entries. Entries are grouped into jobs of similar
+        size, parsed by the workers and merged back in file order. Tables
+        keyed 1..n come back as lists, as with LuaParser.collect.
+        """
+        if workers <= 1:
+            return LuaParser.parse_savedvariables(content)
+
+        target = max(len(content) // (workers * 4), 1 << 16)
+        layout: Dict[tuple, list] = {}  # split table path -> ordered parts
+        jobs: List[tuple] = []          # (text, [(key, offset in text)])
+
+        def split(path: tuple, start: int, depth: int):
+            parts = layout[path] = []
+            batch: List[tuple] = []
+
+            def flush():
+                if batch:
+                    base, end = batch[0][1], batch[-1][2]
+                    jobs.append((content[base:end], [(key, s - base) for key, s, _, _ in batch]))
+                    parts.append(('job', len(jobs) - 1))
+                    batch.clear()
+
+            for entry in LuaParser._entry_spans(content, start):
+                key, s, e, is_table = entry
+                if is_table and e - s > target and depth < LuaParser.SPLIT_DEPTH:
+                    flush()
+                    parts.append(('table', key))
+                    split(path + (key,), s, depth + 1)
+                    continue
+                batch.append(entry)
+                if batch[-1][2] - batch[0][1] >= target:
+                    flush()
+            flush()
+
+        top_level = []
+        tokens = LuaTokenizer(content)
+        for kind, text, _, _ in tokens:
+            if kind != 'field':
+                continue
+            tok = tokens.next_token()
+            if tok is not None and tok[1] == '{':
+                top_level.append(text)
+                split((text,), tok[2], 0)
+                tokens.pos = LuaParser.find_table_end(content, tok[2])
+            else:
+                LuaParser._read_value(tokens, tok)
+
+        with gc_paused():
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_parse_entries_job, *zip(*jobs))) if jobs else []
+
+            def assemble(path: tuple) -> Any:
+                table = {}
+                for kind, ref in layout[path]:
+                    if kind == 'job':
+                        table.update(results[ref])
+                    else:
+                        table[ref] = assemble(path + (ref,))
+                if not table or list(table) == list(range(1, len(table) + 1)):
+                    return list(table.values())
+                return table
+
+            return {name: assemble((name,)) for name in top_level}
+
+    @staticmethod
+    def parse_lazy(content: str) -> Dict[str, Any]:
+        """Index SavedVariables in one brace-matching pass and return its
+        top-level variables as lazy LuaTable views (see LuaTable)"""
+        index = LuaTableIndex(content)
         result = {}
+        tokens = LuaTokenizer(content)
+        for kind, text, _, _ in tokens:
+            if kind != 'field':
+                continue
+            tok = tokens.next_token()
+            if tok is not None and tok[1] == '{':
+                result[text] = LuaTable(index, tok[2])
+                tokens.pos = index.ends[tok[2]]
+            else:
+                LuaParser._read_value(tokens, tok)
+        return result
 
-        # Find all top-level variable assignments
-        pattern = r'([a-zA-Z_][a-zA-Z0-9_]*)\s*=\s*{'
-        for match in re.finditer(pattern, content):
-            var_name = match.group(1)
-            pos = match.start() + len(match.group(0)) - 1  # Position of '{'
-            value, _ = LuaParser.parse_table(content, pos)
-            result[var_name] = value
+    @staticmethod
+    def parse_savedvariables(content: Union[str, bytes, mmap.mmap]) -> Dict[str, Any]:
+        """Parse WoW SavedVariables file (full parse — use extract_discord_queue
+        for speed, or parse_lazy for point lookups in large files)"""
+        if not isinstance(content, str):
+            content = str(content, 'utf-8')
+        result = {}
+
+        # Walk top-level variable assignments: Name = { ... }
+        tokens = LuaTokenizer(content)
+        with gc_paused():
+            for kind, text, _, _ in tokens:
+                if kind != 'field':
+                    continue
+                tok = tokens.next_token()
+                value, _ = LuaParser._read_value(tokens, tok)
+                if tok is not None and tok[1] == '{':
+                    result[text] = value
 
         return result
 
 
+def _parse_entries_job(text: str, entries: List[tuple]) -> List[tuple]:
+    """Process pool worker for LuaParser.parse_savedvariables_parallel"""
+    with gc_paused():
+        return [(key, LuaParser.parse_value(text, pos)[0]) for key, pos in entries]
+
+
+class LuaTableIndex:
+    """Byte spans of every table in a SavedVariables file, recorded in a
+    single brace-matching pass (strings and comments are skipped)"""
+
+    def __init__(self, content: str):
+        self.content = content
+        self.ends: Dict[int, int] = {}     # '{' offset -> offset past its '}'
+        stack = []
+        for m in LuaParser.BRACE_RE.finditer(content):
+            kind = m.lastgroup
+            if kind == 'open':
+                stack.append(m.start())
+            elif kind == 'close' and stack:
+                self.ends[stack.pop()] = m.end()
+        # Unterminated tables run to the end of the file
+        for pos in stack:
+            self.ends[pos] = len(content)
+
+
+class LuaTable(Mapping):
+    """Read-only lazy view of one table in indexed SavedVariables content.
+
+    Nothing is parsed up front. A string key lookup walks this table's
+    immediate entries up to the key, jumping over nested tables via the
+    index, and parses only that entry; the offsets of the keys walked past
+    are kept, so the entries are walked once over all lookups. Iterating
+    scans all entries the same way. Nested tables are returned as LuaTable
+    views and every result is cached.
+    """
+
+    def __init__(self, index: LuaTableIndex, start: int):
+        self._index = index
+        self._start = start
+        self._end = index.ends[start]
+        self._entries: Optional[Dict[Any, Any]] = None  # all entries, once scanned
+        self._cache: Dict[Any, Any] = {}                # point lookups
+        self._offsets: Dict[Any, int] = {}              # key -> value offset, for keys walked past
+        self._resume: Optional[int] = start + 1         # where the walk continues (None = done)
+
+    def __repr__(self):
+        return f"<LuaTable at {self._start}-{self._end}>"
+
+    def _value(self, tokens: LuaTokenizer, tok: Optional[tuple]) -> Any:
+        if tok is not None and tok[0] == 'punct' and tok[1] == '{':
+            tokens.pos = self._index.ends[tok[2]]
+            return LuaTable(self._index, tok[2])
+        return LuaParser._read_value(tokens, tok)[0]
+
+    def _scan(self) -> Dict[Any, Any]:
+        if self._entries is None:
+            tokens = LuaTokenizer(self._index.content, self._start + 1, self._end)
+            entries = {}
+            for key, tok in LuaParser._iter_entries(tokens):
+                value = self._value(tokens, tok)
+                entries[key] = self._cache.get(key, value)
+            self._entries = entries
+        return self._entries
+
+    def _lookup(self, key: str) -> Any:
+        # Tokenize rather than search the raw text: a key name may also
+        # appear inside a string value. The offsets of the keys passed on
+        # the way are recorded, so later lookups resume where this one stopped.
+        content = self._index.content
+        if key not in self._offsets and self._resume is not None:
+            tokens = LuaTokenizer(content, self._resume, self._end)
+            for entry_key, tok in LuaParser._iter_entries(tokens):
+                if tok is None:
+                    self._resume = None
+                    break
+                self._offsets.setdefault(entry_key, tok[2])
+                if tok[0] == 'punct' and tok[1] == '{':
+                    tokens.pos = self._index.ends[tok[2]]
+                self._resume = tokens.pos
+                if entry_key == key:
+                    break
+            else:
+                self._resume = None
+        if key not in self._offsets:
+            raise KeyError(key)
+        tokens = LuaTokenizer(content, self._offsets[key], self._end)
+        return self._value(tokens, tokens.next_token())
+
+    def __getitem__(self, key):
+        if self._entries is not None:
+            return self._entries[key]
+        if key not in self._cache:
+            if not isinstance(key, str):
+                return self._scan()[key]
+            self._cache[key] = self._lookup(key)
+        return self._cache[key]
+
+    def __iter__(self):
+        return iter(self._scan())
+
+    def __len__(self):
+        return len(self._scan())
+
+    def to_python(self) -> Any:
+        """Parse the whole table eagerly (same result as LuaParser.parse_table)"""
+        with gc_paused():
+            return LuaParser.parse_table(self._index.content, self._start)[0]
+
+
+class DiscordQueueTail:
+    """Incremental parser for the append-only discordQueue.
+
+    DQ:QueueEvent appends events and trims the oldest ones past 100, so the
+    last event seen on the previous read (the anchor) is normally still in
+    the queue. Only the entries after it are parsed; the entries up to it
+    are reused from the previous read. An occurrence of the anchor text only
+    counts if the entries before it match the previous read too (identical
+    events can repeat). When no occurrence fits (queue cleared, file
+    restored...) the whole queue is parsed again.
+    """
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []  # queue as of the last read
+        self.texts: List[str] = []               # raw Lua text of each event
+        self.full_parses = 0
+        self.tail_parses = 0
+        self.last_parsed = 0                     # entries parsed by the last read
+
+    def reset(self):
+        self.events = []
+        self.texts = []
+
+    def _find_anchor(self, content: str, spans: List[tuple]) -> int:
+        if not self.texts:
+            return -1
+        anchor_text = self.texts[-1]
+        size = len(anchor_text)
+        # New events are appended, so the anchor sits near the end
+        for i in range(min(len(spans), len(self.texts)) - 1, -1, -1):
+            start, end = spans[i]
+            if end - start != size or content[start:end] != anchor_text:
+                continue
+            known = self.texts[len(self.texts) - i - 1:]
+            if all(content[s:e] == text for (s, e), text in zip(spans[:i], known)):
+                return i
+        return -1
+
+    def read(self, content: str, brace_start: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return the parsed queue, parsing only entries added since the last read.
+        brace_start is the offset of the queue's '{' (located when omitted)."""
+        if brace_start is None:
+            match = LuaParser.QUEUE_RE.search(content)
+            if not match:
+                self.reset()
+                self.last_parsed = 0
+                return []
+            brace_start = match.end() - 1
+
+        spans = LuaParser.item_spans(content, brace_start)
+        anchor = self._find_anchor(content, spans)
+        # The anchor's position tells how many known events are still queued
+        if anchor >= 0:
+            kept = self.events[len(self.events) - anchor - 1:]
+            new_spans = spans[anchor + 1:]
+            self.tail_parses += 1
+        else:
+            kept = []
+            new_spans = spans
+            self.full_parses += 1
+
+        parsed = [LuaParser.parse_table(content, start)[0] for start, _ in new_spans]
+        self.events = kept + parsed
+        # The raw text carries the event's timestamp, type and fields
+        self.texts = [content[start:end] for start, end in spans]
+        self.last_parsed = len(parsed)
+        return list(self.events)
+
+
+def resolve_savedvariables(spec: Union[str, List[str]]) -> List[Path]:
+    """Expand the savedvariables_path setting: one path or a list, each of
+    which may be a glob (one file per WoW account). Plain paths are kept
+    even if the file does not exist yet."""
+    paths: List[Path] = []
+    for entry in ([spec] if isinstance(spec, str) else spec):
+        entry = os.path.expanduser(str(entry))
+        if glob.has_magic(entry):
+            matches = sorted(glob.glob(entry))
+            if not matches:
+                logger.warning(f"No SavedVariables file matches {entry}")
+            paths.extend(Path(m) for m in matches)
+        else:
+            paths.append(Path(entry))
+    unique: Dict[str, Path] = {}
+    for path in paths:
+        unique.setdefault(os.path.normcase(os.path.abspath(path)), path)
+    return list(unique.values())
+
+
+def account_name(path: Path) -> str:
+    """WoW account of a WTF/Account/<ACCOUNT>/SavedVariables file, for logs"""
+    parts = path.parts
+    if len(parts) >= 3 and parts[-2] == 'SavedVariables':
+        return parts[-3]
+    return str(path.parent)
+
+
+class SavedVariablesReader:
+    """Reads the discordQueue of one SavedVariables file, skipping work when
+    nothing relevant changed.
+
+    WoW rewrites the whole file on every logout/reload, so an mtime change
+    says little about the queue. After the mtime check, the queue is located
+    on the memory-mapped bytes (trying the offset of the previous read
+    first) and only its byte span is hashed; the queue is parsed only when
+    that hash changes.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.last_mtime = 0
+        self.offset_hint = -1       # key offset of the queue on the last read
+        self.queue_hash: Optional[bytes] = None
+        self.tail = DiscordQueueTail()  # Parses only events appended since the last read
+        self.stats = {
+            'checks': 0,
+            'skipped_mtime': 0,     # file untouched
+            'skipped_hash': 0,      # file rewritten, queue bytes identical
+            'parsed': 0,
+            'hint_hits': 0,         # queue found at the cached offset
+        }
+
+    def read(self) -> Optional[list]:
+        """Return the current queue, or None if the file is unchanged.
+        When only the queue hash is unchanged the previous parse is returned."""
+        self.stats['checks'] += 1
+        try:
+            mtime = self.path.stat().st_mtime
+        except OSError:
+            mtime = 0
+        if mtime == self.last_mtime:
+            self.stats['skipped_mtime'] += 1
+            return None  # File unchanged, skip
+
+        # Locate the queue on the raw mapped bytes, copy only its span
+        with mapped_file(self.path) as buf:
+            span = LuaParser.find_queue_span(buf, self.offset_hint)
+            raw = buf[span[1]:span[2]] if span else None
+        # Only remember the mtime once the file was actually read (it may be locked)
+        self.last_mtime = mtime
+        if span is None:
+            self.offset_hint = -1
+            self.queue_hash = None
+            self.tail.reset()
+            return []
+        key_start = span[0]
+        if key_start == self.offset_hint:
+            self.stats['hint_hits'] += 1
+        self.offset_hint = key_start
+
+        digest = hashlib.blake2b(raw, digest_size=16).digest()
+        if digest == self.queue_hash:
+            self.stats['skipped_hash'] += 1
+            logger.debug("SavedVariables rewritten but discordQueue unchanged, skipping parse")
+            return list(self.tail.events)
+        self.queue_hash = digest
+
+        queue = self.tail.read(str(raw, 'utf-8'), 0)
+        self.stats['parsed'] += 1
+        logger.debug(
+            f"Queue: {len(queue)} events, parsed {self.tail.last_parsed} "
+            f"(tail reads={self.tail.tail_parses}, full reads={self.tail.full_parses})"
+        )
+        return queue
+
+    def export_state(self) -> Dict[str, Any]:
+        """Parsed queue and change-detection state, for the snapshot cache"""
+        return {
+            'queue': self.tail.events,
+            'texts': self.tail.texts,
+            'queue_hash': self.queue_hash,
+            'offset_hint': self.offset_hint,
+        }
+
+    def restore_state(self, state: Dict[str, Any]):
+        self.tail.events = state['queue']
+        self.tail.texts = state['texts']
+        self.queue_hash = state['queue_hash']
+        self.offset_hint = state['offset_hint']
+
+    def log_stats(self):
+        s = self.stats
+        logger.info(
+            f"Change detection for {self.path.name} ({account_name(self.path)}): {s['checks']} checks, "
+            f"{s['skipped_mtime']} skipped (mtime), {s['skipped_hash']} skipped (queue unchanged), "
+            f"{s['parsed']} parsed, {s['hint_hits']} offset hint hits"
+        )
+
+
+class SnapshotCache:
+    """On-disk cache of parsed SavedVariables state for fast startup.
+
+    A pickle holding the reader state (parsed queue, raw event texts,
+    queue hash), keyed by the file's size, mtime and content hash. A stale
+    or foreign snapshot is ignored and rebuilt by the caller. The state may
+    predate the last write of the file (it is saved on shutdown); the
+    reader's queue hash check on the first read catches that.
+    """
+
+    VERSION = 2
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    @staticmethod
+    def _content_hash(sv_path: Path) -> bytes:
+        h = hashlib.blake2b(digest_size=16)
+        chunk = 1 << 20
+        with mapped_file(sv_path) as buf:
+            for i in range(0, len(buf), chunk):
+                h.update(buf[i:i + chunk])
+        return h.digest()
+
+    def load(self, sv_path: Path) -> Optional[Dict[str, Any]]:
+        """Return the snapshot for sv_path if it is still valid"""
+        if not self.path.exists():
+            return None
+        try:
+            with open(self.path, 'rb') as f:
+                data = pickle.load(f)
+            if data.get('version') != self.VERSION or data.get('source') != str(sv_path):
+                return None
+            st = sv_path.stat()
+            if (st.st_size, st.st_mtime_ns) != (data['size'], data['mtime_ns']):
+                return None
+            if self._content_hash(sv_path) != data['hash']:
+                return None
+            return data
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable snapshot {self.path}: {e}")
+            return None
+
+    def save(self, sv_path: Path, state: Dict[str, Any]):
+        try:
+            st = sv_path.stat()
+            data = {
+                'version': self.VERSION,
+                'source': str(sv_path),
+                'size': st.st_size,
+                'mtime_ns': st.st_mtime_ns,
+                'hash': self._content_hash(sv_path),
+                'state': state,
+            }
+            tmp = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp, 'wb') as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            logger.warning(f"Failed to save snapshot: {e}")
+
+
+class Outbox:
+    """Durable delivery log for queue events (SQLite).
+
+    Every event read from the discordQueue gets an id derived from its
+    source file, its content and its rank among identical events, so
+    re-reading the queue never records an event twice. Events stay pending until delivered and
+    survive restarts; delivered rows are kept (the most recent
+    KEEP_DELIVERED of each source file) so events still sitting in an
+    addon's queue are recognised, however busy the other accounts are.
+
+    With several accounts, guild events (DEDUPE_EVENTS) are seen by every
+    account of the guild: one read from another source within
+    `dedupe_window` seconds of an already recorded one is recorded as
+    delivered instead of being posted twice.
+    """
+
+    KEEP_DELIVERED = 1000  # The addon keeps at most 100 events per account
+    DEDUPE_EVENTS = {'guild_join', 'guild_leave', 'guild_promote', 'guild_demote'}
+
+    def __init__(self, path: Union[str, Path] = ':memory:', dedupe_window: float = 300):
+        self.path = path
+        self.dedupe_window = dedupe_window
+        self.duplicates = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT NOT NULL UNIQUE, "
+            "timestamp REAL NOT NULL, body TEXT NOT NULL, delivered_at REAL)"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(outbox)")}
+        if 'source' not in columns:  # Outboxes from before multi-account support
+            self._db.execute("ALTER TABLE outbox ADD COLUMN source TEXT NOT NULL DEFAULT ''")
+            self._db.execute("ALTER TABLE outbox ADD COLUMN dedupe_key TEXT")
+        self._db.execute("CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (delivered_at, timestamp)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS outbox_dedupe ON outbox (dedupe_key, timestamp)")
+        self._db.commit()
+
+    @staticmethod
+    def _body(event: Dict[str, Any]) -> str:
+        return json.dumps({k: v for k, v in event.items() if not k.startswith('_')},
+                          sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+    @classmethod
+    def event_ids(cls, events: List[Dict[str, Any]], source: str = '') -> List[str]:
+        """Content-derived ids; identical events (same second, same content)
+        are told apart by their rank in the queue. Each source file has its
+        own ids: two accounts can log the same event."""
+        prefix = f"{source}\0" if source else ''
+        seen: Dict[str, int] = {}
+        ids = []
+        for event in events:
+            digest = hashlib.blake2b((prefix + cls._body(event)).encode('utf-8'), digest_size=12).hexdigest()
+            seen[digest] = seen.get(digest, 0) + 1
+            ids.append(f"{digest}-{seen[digest]}")
+        return ids
+
+    @classmethod
+    def dedupe_key(cls, event: Dict[str, Any]) -> Optional[str]:
+        """Key shared by the copies of a guild event seen from several accounts.
+        Only the first description line counts: the rest comes from each
+        account's own contact data."""
+        event_type = event.get('eventType', '')
+        if event_type not in cls.DEDUPE_EVENTS:
+            return None
+        headline = str(event.get('description', '')).split('\n', 1)[0]
+        return f"{event_type}|{headline}"
+
+    def _duplicate(self, key: str, timestamp: float, source: str) -> bool:
+        return self._db.execute(
+            "SELECT 1 FROM outbox WHERE dedupe_key = ? AND source != ? "
+            "AND timestamp BETWEEN ? AND ? LIMIT 1",
+            (key, source, timestamp - self.dedupe_window, timestamp + self.dedupe_window)
+        ).fetchone() is not None
+
+    def _existing(self, ids: List[str], source: Optional[str] = None) -> set:
+        """The ids already recorded (from `source` or no source, if given)"""
+        if not ids:
+            return set()
+        query = f"SELECT id FROM outbox WHERE id IN ({','.join('?' * len(ids))})"
+        if source is None:
+            return {row[0] for row in self._db.execute(query, ids)}
+        return {row[0] for row in self._db.execute(query + " AND source IN (?, '')", ids + [source])}
+
+    def add(self, events: list, delivered_up_to: float = 0, source: str = '') -> int:
+        """Record the events of a queue read from `source`; returns how many
+        were new. Events at or before `delivered_up_to` are recorded as
+        delivered (import of the timestamp checkpoint of older versions),
+        as are guild events another source already recorded."""
+        events = [e for e in events if isinstance(e, dict)]
+        ids = self.event_ids(events, source)
+        now = time.time()
+        with self._lock:
+            known = self._existing(ids)
+            if source:
+                # Rows recorded before ids included the source file
+                legacy = self.event_ids(events)
+                found = self._existing(legacy, source)
+                known |= {event_id for event_id, old in zip(ids, legacy) if old in found}
+            rows = []
+            for event, event_id in zip(events, ids):
+                if event_id in known:
+                    continue
+                timestamp = event.get('timestamp', 0)
+                key = self.dedupe_key(event)
+                delivered_at = None
+                if timestamp <= delivered_up_to:
+                    delivered_at = now
+                elif key and self._duplicate(key, timestamp, source):
+                    delivered_at = now
+                    self.duplicates += 1
+                    logger.debug(f"Outbox: {event.get('eventType')} from {source} already recorded from another account")
+                rows.append((event_id, timestamp, self._body(event), delivered_at, source, key))
+            before = self._db.total_changes
+            self._db.executemany(
+                "INSERT OR IGNORE INTO outbox (id, timestamp, body, delivered_at, source, dedupe_key) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._db.commit()
+            return self._db.total_changes - before
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Undelivered events, oldest first, each tagged with its '_outbox_id'"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, body FROM outbox WHERE delivered_at IS NULL ORDER BY timestamp, seq"
+            ).fetchall()
+        events = []
+        for event_id, body in rows:
+            event = json.loads(body)
+            event['_outbox_id'] = event_id
+            events.append(event)
+        return events
+
+    def still_pending(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """The events of an earlier pending() read not delivered since"""
+        ids = [e['_outbox_id'] for e in events]
+        if not ids:
+            return []
+        with self._lock:
+            pending = {row[0] for row in self._db.execute(
+                f"SELECT id FROM outbox WHERE delivered_at IS NULL AND id IN ({','.join('?' * len(ids))})",
+                ids)}
+        return [e for e in events if e['_outbox_id'] in pending]
+
+    def mark_delivered(self, events: List[Dict[str, Any]]):
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "UPDATE outbox SET delivered_at = ? WHERE id = ?",
+                [(now, e['_outbox_id']) for e in events if '_outbox_id' in e]
+            )
+            self._db.execute(
+                "DELETE FROM outbox WHERE delivered_at IS NOT NULL AND seq IN ("
+                "SELECT seq FROM (SELECT seq, ROW_NUMBER() OVER "
+                "(PARTITION BY source ORDER BY seq DESC) AS newer FROM outbox) WHERE newer > ?)",
+                (self.KEEP_DELIVERED,)
+            )
+            self._db.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM outbox WHERE delivered_at IS NULL").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class HttpClient:
+    """Shared HTTP layer for Discord and Raider.io.
+
+    One requests.Session per host, each with its own keep-alive connection
+    pool, so only the first request to a host pays the TCP+TLS handshake.
+    Request latencies are counted in a per-host histogram.
+    """
+
+    LATENCY_BUCKETS_MS = (50, 100, 200, 400, 800, 1600, 3200)
+
+    def __init__(self, pool_size: int = 4, timeout: float = 10):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+        self.latency: Dict[str, List[int]] = {}  # host -> counts per bucket (+ overflow)
+
+    @staticmethod
+    def dumps(payload: Any) -> bytes:
+        """Serialize a JSON body once, so retries resend the same bytes"""
+        return json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    def _session(self, host: str) -> requests.Session:
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._sessions[host] = session
+            return session
+
+    def _record(self, host: str, elapsed_ms: float):
+        with self._lock:
+            counts = self.latency.setdefault(host, [0] * (len(self.LATENCY_BUCKETS_MS) + 1))
+            counts[bisect.bisect_left(self.LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+
+    def request(self, method: str, url: str, timeout: Optional[float] = None,
+                **kwargs) -> requests.Response:
+        host = urlsplit(url).netloc
+        session = self._session(host)
+        start = time.perf_counter()
+        try:
+            return session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+        finally:
+            self._record(host, (time.perf_counter() - start) * 1000)
+
+    def get(self, url: str, timeout: Optional[float] = None, **kwargs) -> requests.Response:
+        return self.request('GET', url, timeout=timeout, **kwargs)
+
+    def post_json(self, url: str, body: bytes, timeout: Optional[float] = None,
+                  **kwargs) -> requests.Response:
+        """POST a body already serialized with HttpClient.dumps"""
+        headers = {'Content-Type': 'application/json'}
+        headers.update(kwargs.pop('headers', {}))
+        return self.request('POST', url, timeout=timeout, data=body, headers=headers, **kwargs)
+
+    def log_latency(self):
+        labels = [f"<{b}ms" for b in self.LATENCY_BUCKETS_MS] + [f">={self.LATENCY_BUCKETS_MS[-1]}ms"]
+        with self._lock:
+            for host, counts in self.latency.items():
+                histogram = ', '.join(f"{label}: {n}" for label, n in zip(labels, counts) if n)
+                logger.info(f"HTTP latency {host} ({sum(counts)} requests): {histogram}")
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+class RaiderioCache:
+    """Persistent Raider.io lookup cache (SQLite).
+
+    Entries expire after `ttl` seconds, or `negative_ttl` for characters
+    Raider.io does not know (stored as an empty dict). The table is bounded
+    to `max_entries` rows, evicting the least recently used. get() is a
+    lookup (counted, refreshes LRU order); peek() only reads, for layout
+    and rendering. Safe to share between threads.
+    """
+
+    def __init__(self, path: Union[str, Path] = ':memory:', ttl: float = 86400,
+                 negative_ttl: float = 3600, max_entries: int = 5000):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'stored': 0, 'evicted': 0}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS rio ("
+            "key TEXT PRIMARY KEY, data TEXT NOT NULL, "
+            "fetched_at REAL NOT NULL, used_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS rio_used ON rio (used_at)")
+        self._prune()  # max_entries may have been lowered since the last run
+        self._db.commit()
+
+    def _prune(self):
+        """Evict least recently used rows beyond max_entries (caller commits)"""
+        self.stats['evicted'] += self._db.execute(
+            "DELETE FROM rio WHERE key IN "
+            "(SELECT key FROM rio ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        ).rowcount
+
+    def _fresh(self, data: str, fetched_at: float, now: float) -> bool:
+        ttl = self.ttl if data != '{}' else self.negative_ttl
+        return now - fetched_at < ttl
+
+    def peek(self, key: str) -> Optional[Dict[str, Any]]:
+        """Fresh entry, or None (does not count as a hit or touch LRU order)"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data, fetched_at FROM rio WHERE key = ?", (key,)).fetchone()
+        if row is None or not self._fresh(row[0], row[1], time.time()):
+            return None
+        return json.loads(row[0])
+
+    def __contains__(self, key: str) -> bool:
+        return self.peek(key) is not None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data, fetched_at FROM rio WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+            if not self._fresh(row[0], row[1], now):
+                self._db.execute("DELETE FROM rio WHERE key = ?", (key,))
+                self._db.commit()
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+            self._db.execute("UPDATE rio SET used_at = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.stats['hits'] += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, data: Dict[str, Any]):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO rio (key, data, fetched_at, used_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(data, separators=(',', ':')), now, now)
+            )
+            self._prune()
+            self._db.commit()
+            self.stats['stored'] += 1
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM rio").fetchone()[0]
+
+    def log_stats(self):
+        s = self.stats
+        lookups = s['hits'] + s['misses']
+        rate = f"{s['hits'] * 100 / lookups:.0f}%" if lookups else "n/a"
+        logger.info(
+            f"Raider.io cache: {len(self)} entries, {s['hits']} hits / {s['misses']} misses "
+            f"({rate}), {s['expired']} expired, {s['evicted']} evicted"
+        )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class CircuitBreaker:
+    """Stops calling a failing service for a cool-down window.
+
+    Closed: calls go through. After `threshold` consecutive failures the
+    breaker opens and `allow()` refuses calls for `cooldown` seconds, then
+    lets a single probe through (half-open): success closes the breaker,
+    failure re-opens it for another cool-down.
+    """
+
+    def __init__(self, name: str, threshold: int = 5, cooldown: float = 60):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if not self.probing and time.monotonic() - self.opened_at >= self.cooldown:
+                self.probing = True
+                return True
+            self.skipped += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info(f"{self.name} is back, circuit closed")
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.probing or (self.opened_at is None and self.failures >= self.threshold):
+                if not self.probing:
+                    logger.warning(
+                        f"{self.name}: {self.failures} failures in a row, "
+                        f"skipping for {self.cooldown:.0f}s"
+                    )
+                self.opened_at = time.monotonic()
+                self.probing = False
+
+
 class DiscordWebhookSender:
     """Sends Discord webhooks with rich WoW-themed embeds + Raider.io data"""
 
@@ -297,11 +1518,26 @@ class DiscordWebhookSender:
     ENRICH_EVENTS = {'guild_join', 'player_joined', 'guild_leave'}
 
     def __init__(self, webhook_url: str, rate_limiter: DiscordRateLimiter,
-                 region: str = "eu"):
+                 region: str = "eu", http: Optional[HttpClient] = None,
+                 raiderio_timeout: float = 5, enrich_workers: int = 4,
+                 rio_cache: Optional[RaiderioCache] = None,
+                 rio_breaker: Optional[CircuitBreaker] = None,
+                 enrich_deadline: float = 30,
+                 rollups: Optional[Dict[str, Dict[str, Any]]] = None):
         self.webhook_url = webhook_url
         self.rate_limiter = rate_limiter
         self.region = region
-        self._rio_cache: Dict[str, Dict[str, Any]] = {}  # name-realm -> raiderio data
+        self.http = http or HttpClient()
+        self.raiderio_timeout = raiderio_timeout
+        self.enrich_workers = enrich_workers
+        self.enrich_deadline = enrich_deadline  # 0 = wait for Raider.io before posting
+        self.rollups = rollups or {}  # eventType -> rollup rule for summaries
+        self._enrich_pool: Optional[ThreadPoolExecutor] = None
+        self._edit_pool: Optional[ThreadPoolExecutor] = None
+        self.rio_cache = rio_cache if rio_cache is not None else RaiderioCache()  # name-realm -> raiderio data
+        self.rio_breaker = rio_breaker or CircuitBreaker('Raider.io')
+        self._rio_inflight: Dict[str, Future] = {}  # name-realm -> lookup in progress
+        self._rio_lock = threading.Lock()
 
     # ── helpers ──────────────────────────────────────────────────────
 
@@ -338,10 +1574,36 @@ class DiscordWebhookSender:
     # ── Raider.io enrichment ────────────────────────────────────────
 
     def _fetch_raiderio(self, name: str, realm: str) -> Dict[str, Any]:
-        """Fetch ilvl, M+ score, raid prog, spec from Raider.io (cached)"""
+        """Fetch ilvl, M+ score, raid prog, spec from Raider.io (cached).
+
+        Concurrent lookups of the same player share a single request.
+        """
         cache_key = f"{name}-{realm}"
-        if cache_key in self._rio_cache:
-            return self._rio_cache[cache_key]
+        cached = self.rio_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        with self._rio_lock:
+            pending = self._rio_inflight.get(cache_key)
+            owner = pending is None
+            if owner:
+                pending = self._rio_inflight[cache_key] = Future()
+        if not owner:
+            return pending.result()
+        try:
+            result = self._lookup_raiderio(name, realm, cache_key)
+            pending.set_result(result)
+            return result
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._rio_lock:
+                del self._rio_inflight[cache_key]
+
+    def _lookup_raiderio(self, name: str, realm: str, cache_key: str) -> Dict[str, Any]:
+        """One Raider.io request, guarded by the circuit breaker"""
+        if not self.rio_breaker.allow():
+            return {}  # Outage: skip enrichment, don't cache
         try:
             slug = self._realm_to_slug(realm)
             url = (
@@ -349,9 +1611,13 @@ class DiscordWebhookSender:
                 f"?region={self.region}&realm={slug}&name={name}"
                 f"&fields=gear,mythic_plus_scores_by_season:current,raid_progression"
             )
-            resp = requests.get(url, timeout=5)
+            resp = self.http.get(url, timeout=self.raiderio_timeout)
+            if resp.status_code == 429 or resp.status_code >= 500:
+                raise requests.HTTPError(f"HTTP {resp.status_code}")
+            self.rio_breaker.record_success()
             if resp.status_code != 200:
-                self._rio_cache[cache_key] = {}
+                if 400 <= resp.status_code < 500:
+                    self.rio_cache.put(cache_key, {})  # Unknown character
                 return {}
             d = resp.json()
             # Extract current raid prog (first key = current tier)
@@ -373,16 +1639,60 @@ class DiscordWebhookSender:
                 "profile_url": d.get("profile_url", ""),
                 "thumbnail": d.get("thumbnail_url", ""),
             }
-            self._rio_cache[cache_key] = result
+            self.rio_cache.put(cache_key, result)
             return result
         except Exception as e:
             logger.debug(f"Raider.io lookup failed for {name}-{realm}: {e}")
-            self._rio_cache[cache_key] = {}
-            return {}
+            self.rio_breaker.record_failure()
+            return {}  # Transient: not cached, the next batch tries again
+
+    def _raiderio(self, name: str, realm: str, fetch: bool = True) -> Dict[str, Any]:
+        """Raider.io data for a player; with fetch=False only the cache is read"""
+        if fetch:
+            return self._fetch_raiderio(name, realm)
+        return self.rio_cache.peek(f"{name}-{realm}") or {}
+
+    def _players_to_enrich(self, events: List[Dict[str, Any]]) -> set:
+        """Distinct (name, realm) of a batch that still need a Raider.io lookup"""
+        players = set()
+        for event in events:
+            if event.get('eventType') in self.ENRICH_EVENTS:
+                pname, prealm = self._parse_player_realm(event.get('description', ''))
+                if pname and prealm and f"{pname}-{prealm}" not in self.rio_cache:
+                    players.add((pname, prealm))
+        return players
+
+    def _prefetch_raiderio(self, events: List[Dict[str, Any]],
+                           timeout: Optional[float] = None) -> bool:
+        """Fetch Raider.io data for every distinct player of a batch through a
+        bounded thread pool, so rendering only reads the cache and the batch
+        costs about as much as its slowest lookup.
+        Returns False if lookups were still running after `timeout`."""
+        players = self._players_to_enrich(events)
+        if not players:
+            return True
+        start = time.perf_counter()
+        _, pending = wait_futures(self._submit_lookups(players), timeout=timeout)
+        logger.debug(f"Raider.io: pre-enriched {len(players) - len(pending)}/{len(players)} players in "
+                     f"{(time.perf_counter() - start) * 1000:.0f} ms")
+        return not pending
+
+    def start_prefetch(self, events: List[Dict[str, Any]]):
+        """Start the Raider.io lookups of a batch without waiting for them"""
+        players = self._players_to_enrich(events)
+        if players:
+            self._submit_lookups(players)
+
+    def _submit_lookups(self, players: Iterable[tuple]) -> List[Future]:
+        with self._rio_lock:
+            if self._enrich_pool is None:
+                self._enrich_pool = ThreadPoolExecutor(
+                    max_workers=self.enrich_workers, thread_name_prefix='raiderio')
+        return [self._enrich_pool.submit(self._fetch_raiderio, *player) for player in players]
 
     # ── rich embed for player events ────────────────────────────────
 
-    def _build_player_embed(self, event: Dict[str, Any]) -> dict:
+    def _build_player_embed(self, event: Dict[str, Any], fetch: bool = True) -> dict:
         event_type = event.get('eventType', 'unknown')
         fm = self._fields_to_map(event.get('fields', []))
         ts = event.get('timestamp', time.time())
@@ -395,7 +1705,7 @@ class DiscordWebhookSender:
         if event_type in self.ENRICH_EVENTS:
             pname, prealm = self._parse_player_realm(event.get('description', ''))
             if pname and prealm:
-                rio = self._fetch_raiderio(pname, prealm)
+                rio = self._raiderio(pname, prealm, fetch)
 
         # ── description ──
         desc = event.get('description', '')
@@ -533,42 +1843,243 @@ class DiscordWebhookSender:
 
     # ── send ────────────────────────────────────────────────────────
 
-    def send_event(self, event: Dict[str, Any]) -> bool:
-        try:
-            self.rate_limiter.wait_if_needed()
-            event_type = event.get('eventType', 'unknown')
+    def _payload(self, embeds: List[dict]) -> dict:
+        return {
+            "username": "CelestialRecruiter",
+            "avatar_url": self.BOT_ICON,
+            "embeds": embeds,
+        }
 
-            if event_type in self.PLAYER_EVENTS:
-                embed = self._build_player_embed(event)
-            else:
-                embed = self._build_system_embed(event)
+    def _build_event_embed(self, event: Dict[str, Any], fetch: bool = True) -> dict:
+        if event.get('eventType', 'unknown') in self.PLAYER_EVENTS:
+            return self._build_player_embed(event, fetch)
+        return self._build_system_embed(event)
 
-            payload = {
-                "username": "CelestialRecruiter",
-                "avatar_url": self.BOT_ICON,
-                "embeds": [embed],
-            }
+    def build_events_payload(self, events: List[Dict[str, Any]], fetch: bool = True) -> dict:
+        """Webhook payload with one embed per event (fetches Raider.io data unless fetch=False)"""
+        if fetch:
+            self._prefetch_raiderio(events)
+        return self._payload([self._build_event_embed(event, fetch) for event in events])
 
-            response = requests.post(self.webhook_url, json=payload, timeout=10)
+    # ── multi-embed packing ─────────────────────────────────────────
 
-            if response.status_code == 204:
-                logger.info(f"Sent event: {event_type}")
-                return True
-            elif response.status_code == 429:
-                retry_after = response.json().get('retry_after', 5)
-                logger.warning(f"Discord rate limit hit, waiting {retry_after}s")
-                time.sleep(retry_after)
-                return False
+    # Discord limits for one webhook message
+    MAX_EMBEDS = 10
+    MAX_MESSAGE_CHARS = 6000  # Summed over all embeds of the message
+    ENRICH_RESERVE = 120      # Room kept per embed for Raider.io data added later (spec, ilvl, M+, raid)
+
+    @staticmethod
+    def _embed_chars(embed: dict) -> int:
+        """Characters Discord counts toward the per-message limit"""
+        n = len(embed.get('title', '')) + len(embed.get('description', ''))
+        n += len(embed.get('author', {}).get('name', '')) + len(embed.get('footer', {}).get('text', ''))
+        for field in embed.get('fields', []):
+            n += len(field.get('name', '')) + len(field.get('value', ''))
+        return n
+
+    def pack_events(self, events: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Split events, in order, into as few messages as Discord's embed
+        count and character limits allow"""
+        packs: List[List[Dict[str, Any]]] = []
+        current: List[Dict[str, Any]] = []
+        chars = 0
+        for event in events:
+            size = self._embed_chars(self._build_event_embed(event, fetch=False))
+            if self._players_to_enrich([event]):
+                size += self.ENRICH_RESERVE
+            if current and (len(current) == self.MAX_EMBEDS or chars + size > self.MAX_MESSAGE_CHARS):
+                packs.append(current)
+                current, chars = [], 0
+            current.append(event)
+            chars += size
+        if current:
+            packs.append(current)
+        return packs
+
+    def _webhook_url(self, path: str = '', **params: str) -> str:
+        """Webhook URL with an optional sub-path, keeping any query (e.g. thread_id)"""
+        base, _, query = self.webhook_url.partition('?')
+        query = '&'.join(filter(None, [query] + [f"{k}={v}" for k, v in params.items()]))
+        return base.rstrip('/') + path + (f"?{query}" if query else '')
+
+    def _route(self, method: str, edit: bool = False) -> str:
+        """Rate-limit route of a webhook request (message ids are not part of it)"""
+        return f"{method} {urlsplit(self.webhook_url).path}" + ('/messages' if edit else '')
+
+    # Transient failures worth retrying: the request was not processed
+    RETRY_STATUSES = {429, 502, 503, 504}
+
+    @staticmethod
+    def _not_sent(error: requests.exceptions.ConnectionError) -> bool:
+        """True if the connection failed before the request went out. Other
+        connection errors (reset, remote disconnect) may come after Discord
+        processed it."""
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        reason = getattr(error.args[0], 'reason', None) if error.args else None
+        return isinstance(reason, NewConnectionError)
+
+    def _webhook_request(self, method: str, url: str, body: dict, what: str,
+                         edit: bool = False, priority: bool = False,
+                         files: Optional[Dict[str, tuple]] = None) -> Optional[requests.Response]:
+        """Send a webhook request when its rate-limit bucket allows it
+        (priority requests may use the reserved slots), retrying 429s at
+        the bucket reset and gateway errors / connections that could not be
+        opened with jittered backoff. With `files` the body goes out as
+        multipart payload_json. Returns the final response, or None if the
+        request could not be delivered."""
+        route = self._route(method, edit)
+        data = HttpClient.dumps(body)
+        if files:
+            request_args = {'data': {'payload_json': data.decode('utf-8')}, 'files': files}
+        else:
+            request_args = {'data': data, 'headers': {'Content-Type': 'application/json'}}
+        for attempt in range(self.rate_limiter.max_retries + 1):
+            if not self.rate_limiter.wait_if_needed(route, priority):
+                return None
+            try:
+                response = self.http.request(method, url, **request_args)
+            except requests.exceptions.ConnectionError as e:
+                if not self._not_sent(e):
+                    # Discord may have posted it: leave the retry to the next
+                    # pass rather than resend blindly
+                    logger.error(f"Discord webhook error ({what}): {e}")
+                    return None
+                delay = self.rate_limiter.backoff(attempt)
+                logger.warning(f"Discord webhook error ({what}): {e}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            retry_after = self.rate_limiter.update(route, response)
+            if response.status_code not in self.RETRY_STATUSES:
+                return response
+            if response.status_code == 429:
+                logger.warning(f"Discord rate limit hit ({what}), retrying in {retry_after:.1f}s")
+            else:
+                delay = self.rate_limiter.backoff(attempt)
+                logger.warning(f"Discord webhook {response.status_code} ({what}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+        logger.error(f"Discord webhook: giving up on {what} after {self.rate_limiter.max_retries} retries")
+        return None
+
+    def post_payload(self, payload: dict, what: str, wait: bool = False,
+                     priority: bool = False, files: Optional[Dict[str, tuple]] = None) -> tuple:
+        """POST a payload (and optional attachments) to the webhook, waiting
+        for its rate-limit bucket. Returns (success, message_id) —
+        message_id is only set with wait=True."""
+        try:
+            url = self._webhook_url(wait='true') if wait else self.webhook_url
+            response = self._webhook_request('POST', url, payload, what, priority=priority, files=files)
+            if response is None:
+                return False, None
+
+            if response.status_code in (200, 204):
+                logger.info(f"Sent {what}")
+                message_id = response.json().get('id') if response.status_code == 200 else None
+                return True, message_id
             else:
                 logger.error(f"Discord webhook failed: {response.status_code} - {response.text}")
-                return False
+                return False, None
 
         except requests.exceptions.Timeout:
-            logger.error("Discord webhook timeout")
-            return False
+            logger.error(f"Discord webhook timeout ({what})")
+            return False, None
         except requests.exceptions.RequestException as e:
-            logger.error(f"Discord webhook error: {e}")
+            logger.error(f"Discord webhook error ({what}): {e}")
+            return False, None
+        except Exception as e:
+            logger.error(f"Unexpected error sending webhook ({what}): {e}")
+            return False, None
+
+    def edit_message(self, message_id: str, payload: dict, what: str) -> bool:
+        """Replace the embeds of a message previously sent by this webhook"""
+        try:
+            response = self._webhook_request('PATCH', self._webhook_url(f"/messages/{message_id}"),
+                                             {"embeds": payload["embeds"]}, what, edit=True)
+            if response is not None and response.status_code == 200:
+                logger.info(f"Enriched {what}")
+                return True
+            if response is not None:
+                logger.warning(f"Discord message edit failed: {response.status_code} - {response.text}")
+        except Exception as e:
+            logger.warning(f"Discord message edit error ({what}): {e}")
+        return False
+
+    def close(self):
+        """Stop background enrichment; lookups and edits already running finish"""
+        for pool in (self._edit_pool, self._enrich_pool):
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+    # ── send now, enrich later ──────────────────────────────────────
+
+    def _send_now(self, events: List[Dict[str, Any]], build, what: str,
+                  priority: bool = False) -> tuple:
+        """Post build(fetch) for a batch. Players missing from the Raider.io
+        cache no longer hold the post: it goes out with cached data only, then
+        the message is edited once lookups finish, if within enrich_deadline.
+        Returns post_payload's (success, message_id)."""
+        if self.enrich_deadline <= 0 or not self._players_to_enrich(events):
+            return self.post_payload(build(True), what, priority=priority)
+        deadline = time.monotonic() + self.enrich_deadline
+        payload = build(False)
+        result = self.post_payload(payload, what, wait=True, priority=priority)
+        success, message_id = result
+        if success and message_id:
+            if self._edit_pool is None:
+                self._edit_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='enrich-edit')
+            self._edit_pool.submit(self._enrich_and_edit, message_id, events, build,
+                                   payload, deadline, what)
+        return result
+
+    def _enrich_and_edit(self, message_id: str, events: List[Dict[str, Any]], build,
+                         sent: dict, deadline: float, what: str):
+        try:
+            if not self._prefetch_raiderio(events, timeout=max(0, deadline - time.monotonic())):
+                logger.debug(f"Raider.io too slow for {what}, message left as sent")
+                return
+            payload = build(False)
+            if payload["embeds"] == sent["embeds"]:
+                return  # Lookups failed or had nothing to add
+            if sum(self._embed_chars(e) for e in payload["embeds"]) > self.MAX_MESSAGE_CHARS:
+                return  # Enriched embeds no longer fit in one message
+            if time.monotonic() + self.rate_limiter.delay(self._route('PATCH', edit=True)) >= deadline:
+                return
+            self.edit_message(message_id, payload, what)
+        except Exception as e:
+            logger.error(f"Unexpected error enriching {what}: {e}")
+
+    @staticmethod
+    def _describe(events: List[Dict[str, Any]]) -> str:
+        if len(events) == 1:
+            return f"event: {events[0].get('eventType', 'unknown')}"
+        return f"{len(events)} events"
+
+    def send_events(self, events: List[Dict[str, Any]], priority: bool = False) -> bool:
+        """Send one message with an embed per event (a pack from pack_events)"""
+        try:
+            success, _ = self._send_now(
+                events, lambda fetch: self.build_events_payload(events, fetch),
+                self._describe(events), priority)
+        except Exception as e:
+            logger.error(f"Unexpected error sending webhook: {e}")
             return False
+        return success
+
+    async def _send_async(self, events: List[Dict[str, Any]], build, what: str,
+                          priority: bool = False) -> bool:
+        # Wait for the bucket here so a throttled send holds no executor thread
+        await self.rate_limiter.wait_async(self._route('POST'), priority)
+        loop = asyncio.get_running_loop()
+        success, _ = await loop.run_in_executor(None, self._send_now, events, build, what, priority)
+        return success
+
+    async def send_events_async(self, events: List[Dict[str, Any]], priority: bool = False) -> bool:
+        """send_events for the asyncio mode: enrichment and the POST run in the
+        default executor, rate-limit waits only suspend this task"""
+        try:
+            return await self._send_async(
+                events, lambda fetch: self.build_events_payload(events, fetch),
+                self._describe(events), priority)
         except Exception as e:
             logger.error(f"Unexpected error sending webhook: {e}")
             return False
@@ -588,7 +2099,7 @@ class DiscordWebhookSender:
                      'session_summary'}),
     ]
 
-    def _enrich_player_line(self, event: Dict[str, Any]) -> str:
+    def _enrich_player_line(self, event: Dict[str, Any], fetch: bool = True) -> str:
         """Build a rich line for a player event with class, ilvl, armory link"""
         fm = self._fields_to_map(event.get('fields', []))
         desc = event.get('description', '')
@@ -611,7 +2122,7 @@ class DiscordWebhookSender:
         # Raider.io enrichment for join/leave events
         rio = {}
         if event_type in self.ENRICH_EVENTS:
-            rio = self._fetch_raiderio(pname, prealm)
+            rio = self._raiderio(pname, prealm, fetch)
 
         # Player name line
         slug = self._realm_to_slug(prealm)
@@ -667,86 +2178,208 @@ class DiscordWebhookSender:
 
         return line
 
-    def _build_summary_embed(self, events: List[Dict[str, Any]]) -> dict:
-        """Build a clean summary embed grouping all events by category
-        with armory links and Raider.io enrichment for player events."""
+    OTHER_CATEGORY = "Autres"
 
-        # Group events by category
-        categorized: Dict[str, List[Dict[str, Any]]] = {}
-        uncategorized: List[Dict[str, Any]] = []
+    @classmethod
+    def category_of(cls, event_type: str) -> str:
+        """Summary category of an event type; unknown types go to 'Autres'"""
+        for cat_name, cat_types in cls.SUMMARY_CATEGORIES:
+            if event_type in cat_types:
+                return cat_name
+        return cls.OTHER_CATEGORY
 
+    def _summary_sections(self, events: List[Dict[str, Any]]) -> List[tuple]:
+        """(category, events) in display order"""
+        categorized: Dict[str, List[Dict[str, Any]]] = {}
         for event in events:
-            et = event.get('eventType', 'unknown')
-            placed = False
-            for cat_name, cat_types in self.SUMMARY_CATEGORIES:
-                if et in cat_types:
-                    categorized.setdefault(cat_name, []).append(event)
-                    placed = True
-                    break
-            if not placed:
-                uncategorized.append(event)
+            category = self.category_of(event.get('eventType', 'unknown'))
+            categorized.setdefault(category, []).append(event)
 
-        # Build description with sections
-        description_parts = []
-        first_thumbnail = None  # First player thumbnail for embed
+        order = [cat_name for cat_name, _ in self.SUMMARY_CATEGORIES] + [self.OTHER_CATEGORY]
+        return [(cat_name, categorized[cat_name]) for cat_name in order if cat_name in categorized]
 
-        for cat_name, cat_types in self.SUMMARY_CATEGORIES:
-            cat_events = categorized.get(cat_name, [])
-            if not cat_events:
-                continue
+    @staticmethod
+    def _summary_header(category: str, count: int, continued: bool) -> str:
+        return f"__**{category}**__ ({count})" + (" *(suite)*" if continued else "")
+
+    def _summary_line(self, ev: Dict[str, Any], category: str, fetch: bool = True) -> str:
+        et = ev.get('eventType', '')
+        icon = ev.get('icon', '')
+        title = ev.get('title', ev.get('eventType', '?'))
+
+        if category == "Autres":
+            return f"{icon} {title}"
+
+        # Player events get rich formatting with armory links
+        if et in self.PLAYER_EVENTS:
+            return self._enrich_player_line(ev, fetch)
+
+        # System events: simple formatting
+        desc = ev.get('description', '')
+        if len(desc) > 80:
+            desc = desc[:77] + '...'
+        fields = ev.get('fields', [])
+        line = f"{icon} **{title}**"
+        if desc:
+            line += f"\n> {desc}"
+        # Inline field values
+        if fields:
+            field_parts = [f"{f.get('name', '')}: **{f.get('value', '')}**"
+                           for f in fields[:4] if isinstance(f, dict)]
+            if field_parts:
+                line += f"\n> {' · '.join(field_parts)}"
+        return line
 
-            section_lines = [f"__**{cat_name}**__ ({len(cat_events)})"]
+    # Discord limit for one embed description
+    MAX_DESCRIPTION = 4096
+    SUMMARY_EMBED_OVERHEAD = 200  # Title, author and footer of a summary page
+
+    def _summary_entries(self, category: str, cat_events: List[Dict[str, Any]]) -> List[tuple]:
+        """Items of a summary section: ('event', category, event), or
+        ('rollup', category, events) in place of the first of at least
+        min_count events of a type with a rollup rule"""
+        counts = Counter(ev.get('eventType', '') for ev in cat_events)
+        rolled = {et for et, n in counts.items()
+                  if et in self.rollups and n >= self.rollups[et].get('min_count', 5)}
+        entries = []
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for ev in cat_events:
+            et = ev.get('eventType', '')
+            if et not in rolled:
+                entries.append(('event', category, ev))
+            elif et in groups:
+                groups[et].append(ev)
+            else:
+                groups[et] = [ev]
+                entries.append(('rollup', category, groups[et]))
+        return entries
+
+    def _rollup_line(self, events: List[Dict[str, Any]]) -> str:
+        """One counted line for many events of a type, e.g. "38 messages
+        envoyes", the most frequent values of the rule's group_by fields and
+        the first player names. Never looked up on Raider.io."""
+        first = events[0]
+        rule = self.rollups.get(first.get('eventType', ''), {})
+        label = rule.get('label') or f"{{count}} × {first.get('title', first.get('eventType', '?'))}"
+        line = f"{first.get('icon', '')} **{label.format(count=len(events))}**"
+
+        field_maps = [self._fields_to_map(ev.get('fields', [])) for ev in events]
+        for field in rule.get('group_by', []):
+            top = Counter(fm[field] for fm in field_maps if fm.get(field)).most_common(rule.get('top', 3))
+            if top:
+                line += f"\n> {field}: " + ' · '.join(f"{value} ×{n}" for value, n in top)
+
+        max_names = rule.get('names', 5)
+        if max_names:
+            names = []
+            for ev in events:
+                pname, _ = self._parse_player_realm(ev.get('description', ''))
+                if pname and pname not in names:
+                    names.append(pname)
+            if names:
+                more = len(names) - max_names
+                line += f"\n> {', '.join(names[:max_names])}" + (f" et {more} autres" if more > 0 else "")
+        return line
 
-            for ev in cat_events:
-                et = ev.get('eventType', '')
+    def _summary_item_line(self, item: tuple, fetch: bool = True) -> str:
+        if item[0] == 'rollup':
+            return self._rollup_line(item[2])
+        return self._summary_line(item[2], item[1], fetch)
 
-                # Player events get rich formatting with armory links
-                if et in self.PLAYER_EVENTS:
-                    line = self._enrich_player_line(ev)
-                    section_lines.append(line)
+    def _summary_item_size(self, item: tuple) -> int:
+        size = len(self._summary_item_line(item, fetch=False)) + 2  # + '\n\n' separator
+        if item[0] == 'event' and item[1] != self.OTHER_CATEGORY and self._players_to_enrich([item[2]]):
+            size += self.ENRICH_RESERVE
+        return size
 
-                    # Capture first player thumbnail (already fetched in _enrich_player_line)
-                    if first_thumbnail is None:
-                        pn, pr = self._parse_player_realm(ev.get('description', ''))
-                        if pn and pr:
-                            key = f"{pn}-{pr}"
-                            if key in self._rio_cache:
-                                if self._rio_cache[key].get('thumbnail'):
-                                    first_thumbnail = self._rio_cache[key]['thumbnail']
-                else:
-                    # System events: simple formatting
-                    icon = ev.get('icon', '')
-                    title = ev.get('title', ev.get('eventType', '?'))
-                    desc = ev.get('description', '')
-                    if len(desc) > 80:
-                        desc = desc[:77] + '...'
-                    fields = ev.get('fields', [])
-                    line = f"{icon} **{title}**"
-                    if desc:
-                        line += f"\n> {desc}"
-                    # Inline field values
-                    if fields:
-                        field_parts = [f"{f.get('name', '')}: **{f.get('value', '')}**"
-                                       for f in fields[:4] if isinstance(f, dict)]
-                        if field_parts:
-                            line += f"\n> {' · '.join(field_parts)}"
-                    section_lines.append(line)
-
-            description_parts.append('\n\n'.join(section_lines))
-
-        if uncategorized:
-            lines = [f"__**Autres**__ ({len(uncategorized)})"]
-            for ev in uncategorized:
-                icon = ev.get('icon', '')
-                title = ev.get('title', ev.get('eventType', '?'))
-                lines.append(f"{icon} {title}")
-            description_parts.append('\n\n'.join(lines))
-
-        description = '\n\n'.join(description_parts)
-
-        # Truncate if too long for Discord (max 4096 chars)
-        if len(description) > 3900:
-            description = description[:3900] + '\n\n*... (tronque)*'
+    @staticmethod
+    def _item_events(item: tuple) -> List[Dict[str, Any]]:
+        return item[2] if item[0] == 'rollup' else [item[2]]
+
+    def summary_chars(self, events: List[Dict[str, Any]]) -> int:
+        """Size of the summary text for these events, measured like
+        paginate_summary (without page and message overhead)"""
+        return sum(
+            len(self._summary_header(category, len(cat_events), False)) + 2
+            + sum(self._summary_item_size(item) for item in self._summary_entries(category, cat_events))
+            for category, cat_events in self._summary_sections(events)
+        )
+
+    def paginate_summary(self, events: List[Dict[str, Any]]) -> List[List[List[tuple]]]:
+        """Lay out a summary as messages -> pages (one embed each) -> items,
+        where an item is ('header', category, count, continued),
+        ('event', category, event) or ('rollup', category, events). Pages
+        break between items, a section
+        cut by a page break is continued under a "(suite)" header, and pages
+        are packed into as few messages as the embed and character limits
+        allow. Sizes are measured from cached Raider.io data plus
+        ENRICH_RESERVE for players still to look up, so enriching later
+        never changes the layout."""
+        messages: List[List[List[tuple]]] = []
+        page_chars = message_chars = 0
+
+        def fits(size: int) -> bool:
+            return bool(messages) and page_chars + size <= self.MAX_DESCRIPTION \
+                and message_chars + size <= self.MAX_MESSAGE_CHARS
+
+        def start_page(size: int):
+            # Next embed of this message if it still has room, else a new message
+            nonlocal page_chars, message_chars
+            if messages and len(messages[-1]) < self.MAX_EMBEDS \
+                    and message_chars + self.SUMMARY_EMBED_OVERHEAD + size <= self.MAX_MESSAGE_CHARS:
+                messages[-1].append([])
+            else:
+                messages.append([[]])
+                message_chars = 0
+            message_chars += self.SUMMARY_EMBED_OVERHEAD
+            page_chars = 0
+
+        def add(item: tuple, size: int):
+            nonlocal page_chars, message_chars
+            messages[-1][-1].append(item)
+            page_chars += size
+            message_chars += size
+
+        for category, cat_events in self._summary_sections(events):
+            header_size = len(self._summary_header(category, len(cat_events), False)) + 2
+            continued_size = len(self._summary_header(category, len(cat_events), True)) + 2
+            for i, item in enumerate(self._summary_entries(category, cat_events)):
+                size = self._summary_item_size(item)
+                if i == 0:
+                    # Keep the header with the section's first event
+                    if not fits(header_size + size):
+                        start_page(header_size + size)
+                    add(('header', category, len(cat_events), False), header_size)
+                elif not fits(size):
+                    start_page(continued_size + size)
+                    add(('header', category, len(cat_events), True), continued_size)
+                add(item, size)
+        return messages
+
+    def _render_summary_page(self, events: List[Dict[str, Any]], items: List[tuple],
+                             page: int, pages: int, fetch: bool = True) -> dict:
+        """Embed for one summary page; `events` is the whole batch (title and time range)"""
+        parts = []
+        first_thumbnail = None  # First player thumbnail for embed
+        for item in items:
+            if item[0] == 'header':
+                parts.append(self._summary_header(item[1], item[2], item[3]))
+                continue
+            line = self._summary_item_line(item, fetch)
+            # Description limit is a hard error; a single line never gets near it in practice
+            parts.append(line[:self.MAX_DESCRIPTION - 2])
+            if item[0] != 'event':
+                continue
+            _, category, ev = item
+
+            # Capture first player thumbnail (already fetched in _enrich_player_line)
+            if first_thumbnail is None and page == 1 and category != "Autres" \
+                    and ev.get('eventType', '') in self.PLAYER_EVENTS:
+                pn, pr = self._parse_player_realm(ev.get('description', ''))
+                if pn and pr:
+                    first_thumbnail = (self.rio_cache.peek(f"{pn}-{pr}") or {}).get('thumbnail') or None
+
+        description = '\n\n'.join(parts)[:self.MAX_DESCRIPTION]
 
         # Time range
         timestamps = [e.get('timestamp', 0) for e in events if e.get('timestamp')]
@@ -759,21 +2392,23 @@ class DiscordWebhookSender:
         # Date display
         date_str = time_min.strftime('%d/%m/%Y')
         time_range = f"{time_min.strftime('%H:%M')} — {time_max.strftime('%H:%M')}"
+        page_str = f" · {page}/{pages}" if pages > 1 else ""
 
         embed = {
-            "author": {
-                "name": f"Resume CelestialRecruiter",
-                "icon_url": self.BOT_ICON,
-            },
-            "title": f"{len(events)} evenement{'s' if len(events) > 1 else ''} · {date_str}",
+            "title": f"{len(events)} evenement{'s' if len(events) > 1 else ''} · {date_str}{page_str}",
             "description": description,
             "color": 0xC9AA71,  # CelestialRecruiter gold
             "timestamp": datetime.fromtimestamp(ts_max, tz=timezone.utc).isoformat(),
             "footer": {
-                "text": f"CelestialRecruiter · {time_range}",
+                "text": f"CelestialRecruiter · {time_range}{page_str}",
                 "icon_url": self.BOT_ICON,
             },
         }
+        if page == 1:
+            embed["author"] = {
+                "name": f"Resume CelestialRecruiter",
+                "icon_url": self.BOT_ICON,
+            }
 
         # Use first player thumbnail or bot icon
         if first_thumbnail:
@@ -781,64 +2416,419 @@ class DiscordWebhookSender:
 
         return embed
 
-    def send_summary(self, events: List[Dict[str, Any]]) -> bool:
-        """Send a summary embed grouping multiple events into one message"""
-        self._rio_cache.clear()  # Fresh cache per summary batch
+    def _summary_messages(self, events: List[Dict[str, Any]]) -> List[tuple]:
+        """(message events, detailed events, build(fetch) -> payload, description)
+        per summary message; only detailed events (not rolled up) are enriched"""
+        layout = self.paginate_summary(events)
+        pages = sum(len(message) for message in layout)
+        result = []
+        first_page = 1
+        for n, message in enumerate(layout, 1):
+            message_events = [ev for page in message for item in page if item[0] != 'header'
+                              for ev in self._item_events(item)]
+            detailed = [item[2] for page in message for item in page if item[0] == 'event']
+
+            def build(fetch: bool, message=message, first_page=first_page, detailed=detailed) -> dict:
+                if fetch:
+                    self._prefetch_raiderio(detailed)
+                return self._payload([
+                    self._render_summary_page(events, items, first_page + i, pages, fetch)
+                    for i, items in enumerate(message)
+                ])
+
+            what = f"summary with {len(events)} events"
+            if len(layout) > 1:
+                what += f" ({n}/{len(layout)})"
+            result.append((message_events, detailed, build, what))
+            first_page += len(message)
+        return result
+
+    def send_summary(self, events: List[Dict[str, Any]], on_sent=None) -> bool:
+        """Send a summary grouping multiple events, paginated over as many
+        embeds and messages as needed. on_sent(events) is called after each
+        delivered message."""
         try:
-            self.rate_limiter.wait_if_needed()
+            for message_events, detailed, build, what in self._summary_messages(events):
+                success, _ = self._send_now(detailed, build, what)
+                if not success:
+                    return False
+                if on_sent:
+                    on_sent(message_events)
+        except Exception as e:
+            logger.error(f"Unexpected error sending summary webhook: {e}")
+            return False
+        return True
 
-            embed = self._build_summary_embed(events)
+    async def send_summary_async(self, events: List[Dict[str, Any]], on_sent=None) -> bool:
+        """send_summary for the asyncio mode"""
+        try:
+            loop = asyncio.get_running_loop()
+            messages = await loop.run_in_executor(None, self._summary_messages, events)
+            for message_events, detailed, build, what in messages:
+                if not await self._send_async(detailed, build, what):
+                    return False
+                if on_sent:
+                    on_sent(message_events)
+        except Exception as e:
+            logger.error(f"Unexpected error sending summary webhook: {e}")
+            return False
+        return True
 
-            payload = {
-                "username": "CelestialRecruiter",
-                "avatar_url": self.BOT_ICON,
-                "embeds": [embed],
-            }
 
-            response = requests.post(self.webhook_url, json=payload, timeout=10)
+    # ── bulk attachment ─────────────────────────────────────────────
 
-            if response.status_code == 204:
-                logger.info(f"Sent summary with {len(events)} events")
-                return True
-            elif response.status_code == 429:
-                retry_after = response.json().get('retry_after', 5)
-                logger.warning(f"Discord rate limit hit, waiting {retry_after}s")
-                time.sleep(retry_after)
-                return False
-            else:
-                logger.error(f"Discord webhook failed: {response.status_code} - {response.text}")
-                return False
+    MAX_ATTACHMENT_BYTES = 10 * 1024 * 1024  # Discord upload limit without boost
+    BULK_COLUMNS = ['date', 'eventType', 'title', 'description']
 
-        except requests.exceptions.Timeout:
-            logger.error("Discord webhook timeout (summary)")
-            return False
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Discord webhook error (summary): {e}")
-            return False
+    @staticmethod
+    def _plain(text: str) -> str:
+        return text.replace('**', '').replace('\n', ' ').strip()
+
+    def build_attachment(self, events: List[Dict[str, Any]], fmt: str = 'csv') -> tuple:
+        """(filename, bytes, content type) of a file listing every event with
+        its fields: CSV with one column per field name, or JSON lines"""
+        rows = []
+        for ev in events:
+            ts = ev.get('timestamp', 0)
+            rows.append({
+                'date': datetime.fromtimestamp(ts).isoformat(timespec='seconds') if ts else '',
+                'eventType': ev.get('eventType', ''),
+                'title': ev.get('title', ''),
+                'description': self._plain(ev.get('description', '')),
+                'fields': self._fields_to_map(ev.get('fields', [])),
+            })
+        stamp = datetime.fromtimestamp(max((e.get('timestamp', 0) for e in events), default=0) or time.time())
+        name = f"celestialrecruiter-{stamp.strftime('%Y%m%d-%H%M%S')}"
+
+        if fmt == 'jsonl':
+            lines = [json.dumps(row, ensure_ascii=False) for row in rows]
+            return f"{name}.jsonl", ('\n'.join(lines) + '\n').encode('utf-8'), 'application/x-ndjson'
+
+        field_names = list(dict.fromkeys(key for row in rows for key in row['fields']))
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(self.BULK_COLUMNS + field_names)
+        for row in rows:
+            writer.writerow([row[col] for col in self.BULK_COLUMNS]
+                            + [row['fields'].get(key, '') for key in field_names])
+        # BOM so spreadsheet tools read the accents as UTF-8
+        return f"{name}.csv", out.getvalue().encode('utf-8-sig'), 'text/csv'
+
+    def _build_bulk_embed(self, events: List[Dict[str, Any]], filename: str) -> dict:
+        """Compact summary of a bulk upload: counts per category and event
+        title, the full list being in the attachment"""
+        lines = []
+        for category, cat_events in self._summary_sections(events):
+            titles = Counter(ev.get('title') or ev.get('eventType', '?') for ev in cat_events)
+            top = titles.most_common(5)
+            lines.append(f"**{category}** ({len(cat_events)}) — "
+                         + ' · '.join(f"{title} ×{n}" for title, n in top)
+                         + (" · ..." if len(titles) > len(top) else ""))
+        lines.append(f"\nDetail complet dans `{filename}`")
+
+        timestamps = [e.get('timestamp', 0) for e in events if e.get('timestamp')]
+        ts_min = min(timestamps) if timestamps else time.time()
+        ts_max = max(timestamps) if timestamps else time.time()
+        time_min = datetime.fromtimestamp(ts_min)
+        time_max = datetime.fromtimestamp(ts_max)
+        return {
+            "author": {"name": "Resume CelestialRecruiter", "icon_url": self.BOT_ICON},
+            "title": f"{len(events)} evenements · {time_min.strftime('%d/%m/%Y')}",
+            "description": '\n'.join(lines)[:self.MAX_DESCRIPTION],
+            "color": 0xC9AA71,  # CelestialRecruiter gold
+            "timestamp": datetime.fromtimestamp(ts_max, tz=timezone.utc).isoformat(),
+            "footer": {
+                "text": f"CelestialRecruiter · {time_min.strftime('%H:%M')} — {time_max.strftime('%H:%M')}",
+                "icon_url": self.BOT_ICON,
+            },
+        }
+
+    def _bulk_request(self, events: List[Dict[str, Any]], fmt: str) -> Optional[tuple]:
+        """(payload, files) of a bulk upload, or None if the file is too large"""
+        filename, content, content_type = self.build_attachment(events, fmt)
+        if len(content) > self.MAX_ATTACHMENT_BYTES:
+            logger.warning(f"Bulk file for {len(events)} events is {len(content)} bytes, too large to upload")
+            return None
+        payload = self._payload([self._build_bulk_embed(events, filename)])
+        return payload, {'files[0]': (filename, content, content_type)}
+
+    def send_bulk(self, events: List[Dict[str, Any]], fmt: str = 'csv') -> Optional[bool]:
+        """Send a whole backlog in one message: a compact embed plus the
+        events as an attached file. Returns None if it does not fit in one
+        upload (the caller falls back to summaries)."""
+        try:
+            request = self._bulk_request(events, fmt)
+            if request is None:
+                return None
+            payload, files = request
+            success, _ = self.post_payload(payload, f"{len(events)} events as {fmt}", files=files)
         except Exception as e:
-            logger.error(f"Unexpected error sending summary webhook: {e}")
+            logger.error(f"Unexpected error sending bulk webhook: {e}")
             return False
+        return success
+
+    async def send_bulk_async(self, events: List[Dict[str, Any]], fmt: str = 'csv') -> Optional[bool]:
+        """send_bulk for the asyncio mode"""
+        await self.rate_limiter.wait_async(self._route('POST'))
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.send_bulk, events, fmt)
 
 
 class SavedVariablesWatcher(FileSystemEventHandler):
-    """Watches SavedVariables file for changes"""
+    """Watches SavedVariables files for changes.
+
+    One handler serves every watched file (it may be scheduled on several
+    directories); other files in those directories are ignored and the
+    callback gets the path that changed.
+    """
 
-    def __init__(self, callback):
+    def __init__(self, callback, paths: Iterable[Path]):
         self.callback = callback
-        self.last_modified = 0
+        self.paths = {os.path.normcase(os.path.abspath(p)): Path(p) for p in paths}
+        self.last_modified: Dict[str, float] = {}
         self.debounce_delay = 1  # seconds
 
-    def on_modified(self, event):
-        if event.is_directory:
+    @property
+    def directories(self) -> List[str]:
+        return sorted({str(p.parent) for p in self.paths.values()})
+
+    def _changed(self, src_path: str):
+        key = os.path.normcase(os.path.abspath(src_path))
+        path = self.paths.get(key)
+        if path is None:
             return
 
         # Debounce: WoW may write the file multiple times
         now = time.time()
-        if now - self.last_modified < self.debounce_delay:
+        if now - self.last_modified.get(key, 0) < self.debounce_delay:
             return
 
-        self.last_modified = now
-        self.callback()
+        self.last_modified[key] = now
+        self.callback(path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self._changed(event.src_path)
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self._changed(event.src_path)
+
+    def on_moved(self, event):
+        # Files saved through a temporary file and a rename
+        if not event.is_directory:
+            self._changed(event.dest_path)
+
+
+class DeliveryLane:
+    """Delivery stage of one webhook destination.
+
+    Each lane has its own sender (and so its own rate-limit state), bounded
+    batch queue and thread, so a slow or rate-limited channel never delays
+    the others. Every destination has a second, priority lane for alert
+    events: they are sent one per message as soon as they are read, using
+    the rate-limit requests reserved for them, while routine events wait
+    for the normal lane's summary.
+
+    In summary mode the normal lane batches by window: after the first
+    batch arrives it keeps collecting until batch_max_events events or
+    batch_max_chars characters of summary are reached, or the first batch
+    has waited batch_linger seconds, whichever comes first.
+    """
+
+    def __init__(self, name: str, sender: 'DiscordWebhookSender', outbox: 'Outbox',
+                 max_batches: int = 16, priority: bool = False):
+        self.name = f"{name} (priority)" if priority else name
+        self.sender = sender
+        self.outbox = outbox
+        self.priority = priority
+        self.batches: Queue = Queue(maxsize=max_batches)
+        self.stats = {'batches': 0, 'events': 0, 'queue_full': 0, 'max_depth': 0,
+                      'failed_batches': 0, 'wait_ms': 0.0, 'max_wait_ms': 0.0}
+        self._queued: set = set()  # Outbox ids handed to the delivery thread
+        self._lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+
+    def offer(self, pending: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Queue the pending events not queued yet; returns them, or an
+        empty list when there is nothing new or the queue is full"""
+        with self._lock:
+            pending = [e for e in pending if e['_outbox_id'] not in self._queued]
+            # A batch may have been delivered (and left _queued) since the
+            # parser read the outbox: only queue what is still pending
+            pending = self.outbox.still_pending(pending) if pending else []
+            if not pending:
+                return []
+            try:
+                self.batches.put_nowait((time.monotonic(), pending))
+            except Full:
+                self.stats['queue_full'] += 1
+                logger.debug(f"Delivery queue {self.name} full, {len(pending)} events stay pending in the outbox")
+                return []
+            self._queued.update(e['_outbox_id'] for e in pending)
+            self.stats['batches'] += 1
+            self.stats['events'] += len(pending)
+            self.stats['max_depth'] = max(self.stats['max_depth'], self.batches.qsize())
+        return pending
+
+    def run(self, bot: 'DiscordWebhookBot', stop: threading.Event):
+        while not stop.is_set():
+            item = self.batches.get()
+            if item is None:
+                break
+            queued_at, pending = item
+            if bot.summary_mode and not self.priority:
+                pending = self._collect(bot, queued_at, pending)
+                if pending is None:
+                    break  # Stopped while collecting: the events stay in the outbox
+            wait_ms = (time.monotonic() - queued_at) * 1000
+            self.stats['wait_ms'] += wait_ms
+            self.stats['max_wait_ms'] = max(self.stats['max_wait_ms'], wait_ms)
+            try:
+                success = bot.deliver(pending, self.sender, self.priority)
+            except Exception as e:
+                logger.error(f"Error in delivery stage {self.name}: {e}")
+                success = False
+            with self._lock:
+                if success:
+                    self._queued.difference_update(e['_outbox_id'] for e in pending)
+                    continue
+                # Drop later batches: the parser re-queues everything still pending, in order
+                self.stats['failed_batches'] += 1
+                try:
+                    while self.batches.get_nowait() is not None:
+                        pass
+                    self.batches.put_nowait(None)  # Keep the stop request
+                except Empty:
+                    pass
+                self._queued.clear()
+            stop.wait(bot.config['check_interval'])
+
+    def _collect(self, bot: 'DiscordWebhookBot', first_queued: float,
+                 pending: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """Merge later batches into this one until the window closes;
+        None if the pipeline was stopped meanwhile"""
+        deadline = first_queued + bot.config['batch_linger']
+        while not bot.batch_full(pending, self.sender):
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self.batches.get(timeout=timeout)
+            except Empty:
+                break
+            if item is None:
+                return None
+            pending = pending + item[1]
+        return pending
+
+    def wake(self):
+        try:
+            self.batches.put_nowait(None)  # Wake the delivery thread
+        except Full:
+            pass  # It checks the stop flag after its current batch
+
+    def log_stats(self):
+        s = self.stats
+        avg_wait = s['wait_ms'] / s['batches'] if s['batches'] else 0
+        logger.info(
+            f"Pipeline {self.name}: {s['batches']} batches / {s['events']} events queued, "
+            f"max depth {s['max_depth']}, queue full {s['queue_full']} times, "
+            f"{s['failed_batches']} failed batches, queue wait {avg_wait:.0f} ms average / "
+            f"{s['max_wait_ms']:.0f} ms max"
+        )
+
+
+class DeliveryPipeline:
+    """Parser and delivery stages of the polling and watching modes.
+
+    The parser thread wakes on a file change (or every check_interval),
+    reads the queues of the files that changed, records new events in the
+    outbox, routes the pending ones to the lane of their webhook and
+    priority, starts
+    their Raider.io lookups and puts them on the lane's bounded batch
+    queue; each lane's delivery thread drains its queue in order. When a
+    queue is full the parser leaves the events pending in the outbox and
+    keeps watching, so detecting changes never waits on delivery; they are
+    queued again once there is room.
+    """
+
+    def __init__(self, bot: 'DiscordWebhookBot', max_batches: int = 16):
+        self.bot = bot
+        self.lanes: Dict[tuple, DeliveryLane] = {
+            (url, priority): DeliveryLane(bot.destination_names[url], sender, bot.outbox,
+                                          max_batches, priority)
+            for url, sender in bot.senders.items() for priority in (True, False)
+        }
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+        self._dirty: set = set()  # Files reported by the watcher since the last pass
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def notify(self, path: Optional[Path] = None):
+        """A SavedVariables file changed (called from the watchdog thread)"""
+        with self._lock:
+            self._dirty.add(path)
+        self._changed.set()
+
+    def start(self):
+        self._changed.set()  # Process existing queue on startup
+        self._threads = [threading.Thread(target=self._parse_loop, name='parser', daemon=True)]
+        for lane in self.lanes.values():
+            lane.thread = threading.Thread(target=lane.run, args=(self.bot, self._stop),
+                                           name=f'delivery-{lane.name}', daemon=True)
+            self._threads.append(lane.thread)
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 10) -> bool:
+        """Stop all stages; False if a thread is still busy after timeout
+        seconds (e.g. a send waiting out a rate limit)"""
+        self._stop.set()
+        self._changed.set()
+        for lane in self.lanes.values():
+            lane.wake()
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(deadline - time.monotonic(), 0))
+        return not any(thread.is_alive() for thread in self._threads)
+
+    # ── parser stage ─────────────────────────────────────────────────
+
+    def _parse_loop(self):
+        interval = self.bot.config['check_interval']
+        consecutive_errors = 0
+        while not self._stop.is_set():
+            self._changed.wait(timeout=interval)
+            if self._stop.is_set():
+                break
+            if self._changed.is_set():
+                self._changed.clear()
+                with self._lock:
+                    dirty, self._dirty = self._dirty, set()
+                self.bot.force_read(None if None in dirty else dirty)
+            try:
+                self._produce()
+                consecutive_errors = 0
+            except Exception as e:
+                consecutive_errors += 1
+                logger.error(f"Error in parser stage ({consecutive_errors}): {e}")
+                # Back off on repeated errors to avoid spinning
+                self._stop.wait(min(interval * consecutive_errors, 60))
+
+    def _produce(self):
+        for path, queue in self.bot.extract_queues():
+            self.bot.record_queue(queue, path)
+        for key, pending in self.bot.route_events(self.bot.outbox.pending()).items():
+            queued = self.lanes[key].offer(pending)
+            if queued:
+                # Enrichment stage: lookups run while earlier batches are delivered
+                self.lanes[key].sender.start_prefetch(queued)
+
+    def log_stats(self):
+        for lane in self.lanes.values():
+            lane.log_stats()
 
 
 class DiscordWebhookBot:
@@ -846,24 +2836,57 @@ class DiscordWebhookBot:
 
     def __init__(self, config_path: str):
         self.config = self.load_config(config_path)
-        self.rate_limiter = DiscordRateLimiter(
-            max_requests=30,
-            window_seconds=60
+        self.http = HttpClient(
+            # Enrichment workers each need a pooled Raider.io connection
+            pool_size=max(self.config['http_pool_size'], self.config['enrich_workers']),
+            timeout=self.config['http_timeout']
+        )
+        self.rio_cache = RaiderioCache(
+            Path('discord_webhook_rio.sqlite'),
+            ttl=self.config['raiderio_cache_ttl'],
+            negative_ttl=self.config['raiderio_negative_ttl'],
+            max_entries=self.config['raiderio_cache_size']
         )
-        self.sender = DiscordWebhookSender(
-            self.config['webhook_url'],
-            self.rate_limiter,
-            region=self.config.get('region', 'eu')
+        self.rio_breaker = CircuitBreaker(
+            'Raider.io',
+            threshold=self.config['raiderio_breaker_threshold'],
+            cooldown=self.config['raiderio_breaker_cooldown']
         )
+
+        # One sender (with its own rate limiter) per destination webhook; the
+        # HTTP pool and Raider.io cache are shared
+        self.senders: Dict[str, DiscordWebhookSender] = {}  # webhook url -> sender
+        self.destination_names: Dict[str, str] = {}         # webhook url -> name for logs
+        self.sender = self._add_destination('default', self.config['webhook_url'])
+        self.rate_limiter = self.sender.rate_limiter
+        self.routes: Dict[str, str] = {}  # eventType or summary category -> webhook url
+        for key, url in self.config['webhooks'].items():
+            self.routes[key] = url
+            self._add_destination(key, url)
         self.summary_mode = self.config.get('summary_mode', True)
+        self.priority_events = set(self.config['priority_events'])  # Sent at once, never summarized
         self.last_processed_timestamp = 0
-        self.savedvariables_path = Path(self.config['savedvariables_path'])
-        self._last_mtime = 0  # Track file modification time to avoid re-parsing unchanged files
+        self._state_lock = threading.Lock()  # Lanes record deliveries from their own threads
+        self._queued_ids: Dict[tuple, set] = {}  # asyncio mode: (webhook url, priority) -> ids handed to its task
+        self.pipeline: Optional[DeliveryPipeline] = None  # polling / watching modes
+        # One reader (parse state) and snapshot per account's SavedVariables file
+        self.savedvariables_paths = resolve_savedvariables(self.config['savedvariables_path'])
+        if not self.savedvariables_paths:
+            logger.error("No SavedVariables file to watch, check savedvariables_path in config.json")
+            sys.exit(1)
+        self.readers = {path: SavedVariablesReader(path) for path in self.savedvariables_paths}
+        self.snapshots = {path: SnapshotCache(self._snapshot_path(path)) for path in self.savedvariables_paths}
 
         # Load last processed timestamp from state file
         self.state_file = Path('discord_webhook_state.json')
         self.load_state()
 
+        # Per-event delivery state; a new outbox starts from the timestamp checkpoint
+        self.outbox = Outbox(Path('discord_webhook_outbox.sqlite'),
+                             dedupe_window=self.config['dedupe_window'])
+        self._import_checkpoint = self.last_processed_timestamp
+        self._import_pending = set(self.savedvariables_paths) if not len(self.outbox) else set()
+
     def load_config(self, config_path: str) -> Dict[str, Any]:
         """Load configuration from file"""
         try:
@@ -887,7 +2910,64 @@ class DiscordWebhookBot:
 
             # Set defaults
             config.setdefault('check_interval', 5)
-            config.setdefault('rate_limit_delay', 2)
+            config.setdefault('rate_limit_retries', 5)
+            config.setdefault('parse_workers', 1)
+            config.setdefault('http_pool_size', 4)
+            config.setdefault('http_timeout', 10)
+            config.setdefault('raiderio_timeout', 5)
+            config.setdefault('enrich_workers', 4)
+            config.setdefault('raiderio_cache_ttl', 86400)
+            config.setdefault('raiderio_negative_ttl', 3600)
+            config.setdefault('raiderio_cache_size', 5000)
+            config.setdefault('raiderio_breaker_threshold', 5)
+            config.setdefault('raiderio_breaker_cooldown', 60)
+            config.setdefault('enrich_deadline', 30)
+            config.setdefault('pipeline_queue_size', 16)
+            config.setdefault('dedupe_window', 300)
+            config.setdefault('webhooks', {})
+            config.setdefault('priority_events', ['limit_reached', 'error_alert'])
+            config.setdefault('priority_reserve', 1)
+            config.setdefault('batch_max_events', 100)
+            config.setdefault('batch_max_chars', 6000)
+            config.setdefault('batch_linger', 0)
+            config.setdefault('bulk_threshold', 0)
+            config.setdefault('bulk_format', 'csv')
+            if config['bulk_format'] not in ('csv', 'jsonl'):
+                logger.error(f"bulk_format must be 'csv' or 'jsonl', not '{config['bulk_format']}'")
+                sys.exit(1)
+            config.setdefault('rollups', {
+                'player_whispered': {'min_count': 5, 'label': "{count} messages envoyes",
+                                     'group_by': ['Classe', 'Zone']},
+                'queue_added': {'min_count': 5, 'label': "{count} joueurs ajoutes a la file",
+                                'group_by': ['Classe', 'Source']},
+            })
+            for event_type, rule in config['rollups'].items():
+                problem = None
+                if not isinstance(rule, dict):
+                    problem = "must be an object"
+                elif any(not isinstance(rule.get(key, 0), int) or rule.get(key, 0) < 0
+                         for key in ('min_count', 'top', 'names')):
+                    problem = "min_count, top and names must be whole numbers"
+                elif (not isinstance(rule.get('group_by', []), list)
+                      or not all(isinstance(field, str) for field in rule.get('group_by', []))):
+                    problem = "group_by must be a list of field names"
+                elif rule.get('label'):
+                    try:
+                        str(rule['label']).format(count=0)
+                    except (KeyError, IndexError, ValueError, AttributeError) as e:
+                        problem = f"label can only use {{count}} ({e!r})"
+                if problem:
+                    logger.error(f"Rollup rule for '{event_type}': {problem}")
+                    sys.exit(1)
+            cls = DiscordWebhookSender
+            known = {cat_name for cat_name, _ in cls.SUMMARY_CATEGORIES} | {cls.OTHER_CATEGORY}
+            known |= set().union(*(cat_types for _, cat_types in cls.SUMMARY_CATEGORIES))
+            for key, url in config['webhooks'].items():
+                if any(placeholder in str(url).upper() for placeholder in placeholders):
+                    logger.error(f"Webhook for '{key}' contains placeholder value. Edit config.json before running.")
+                    sys.exit(1)
+                if key not in known:
+                    logger.warning(f"Webhook route '{key}' is neither a summary category nor a known event type")
 
             return config
 
@@ -919,121 +2999,264 @@ class DiscordWebhookBot:
         except Exception as e:
             logger.error(f"Failed to save state file: {e}")
 
-    def extract_queue(self) -> Optional[list]:
-        """Extract only the discordQueue from SavedVariables (fast, targeted parse)"""
+    def _add_destination(self, name: str, url: str) -> 'DiscordWebhookSender':
+        """Sender for a webhook url; routes sharing a url share its lane"""
+        if url not in self.senders:
+            self.destination_names[url] = name
+            self.senders[url] = DiscordWebhookSender(
+                url,
+                DiscordRateLimiter(max_retries=self.config['rate_limit_retries'],
+                                   name=f"Discord ({name})" if self.senders else "Discord",
+                                   reserved=self.config['priority_reserve']),
+                region=self.config.get('region', 'eu'),
+                http=self.http,
+                raiderio_timeout=self.config['raiderio_timeout'],
+                enrich_workers=self.config['enrich_workers'],
+                rio_cache=self.rio_cache,
+                rio_breaker=self.rio_breaker,
+                enrich_deadline=self.config['enrich_deadline'],
+                rollups=self.config['rollups']
+            )
+        return self.senders[url]
+
+    def destination(self, event: Dict[str, Any]) -> str:
+        """Webhook url of an event: a route for its eventType, else for its
+        summary category, else the default webhook_url"""
+        event_type = event.get('eventType', '')
+        url = self.routes.get(event_type)
+        if url is None:
+            url = self.routes.get(DiscordWebhookSender.category_of(event_type), self.config['webhook_url'])
+        return url
+
+    def route_events(self, events: List[Dict[str, Any]]) -> Dict[tuple, List[Dict[str, Any]]]:
+        """Events grouped by (destination webhook url, priority), in order;
+        priority groups come first"""
+        routed: Dict[tuple, List[Dict[str, Any]]] = {}
+        for event in events:
+            key = (self.destination(event), event.get('eventType') in self.priority_events)
+            routed.setdefault(key, []).append(event)
+        return dict(sorted(routed.items(), key=lambda item: not item[0][1]))
+
+    def batch_full(self, events: List[Dict[str, Any]], sender: 'DiscordWebhookSender') -> bool:
+        """Whether a summary batch has reached batch_max_events or batch_max_chars"""
+        return len(events) >= self.config['batch_max_events'] \
+            or sender.summary_chars(events) >= self.config['batch_max_chars']
+
+    def use_bulk(self, events: List[Dict[str, Any]]) -> bool:
+        """Whether a backlog is large enough to go out as a file attachment"""
+        return 0 < self.config['bulk_threshold'] <= len(events)
+
+    def summary_batches(self, events: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Split pending events into summaries of at most batch_max_events,
+        of even sizes (101 events make 51 + 50, not 100 + 1)"""
+        count = -(-len(events) // max(1, self.config['batch_max_events']))
+        bounds = [len(events) * i // count for i in range(count + 1)]
+        return [events[bounds[i]:bounds[i + 1]] for i in range(count)]
+
+    def _snapshot_path(self, sv_path: Path) -> Path:
+        if len(self.savedvariables_paths) == 1:
+            return Path('discord_webhook_snapshot.pickle')
+        digest = hashlib.blake2b(str(sv_path).encode('utf-8'), digest_size=4).hexdigest()
+        return Path(f"discord_webhook_snapshot-{digest}.pickle")
+
+    def log_targets(self):
+        for path in self.savedvariables_paths:
+            logger.info(f"Watching: {path}")
+        for url, name in self.destination_names.items():
+            routed = sorted(key for key, route in self.routes.items() if route == url)
+            logger.info(f"Webhook {name}: {url[:50]}..." + (f" ({', '.join(routed)})" if routed else ""))
+
+    def force_read(self, paths: Optional[Iterable[Path]] = None):
+        """Reset mtimes so the next check re-reads these files (default: all)"""
+        for path in (self.readers if paths is None else paths):
+            if path in self.readers:
+                self.readers[path].last_mtime = 0
+
+    def extract_queue(self, path: Path) -> Optional[list]:
+        """Extract only the discordQueue from one SavedVariables file (fast, targeted parse)"""
         try:
-            if not self.savedvariables_path.exists():
-                logger.warning(f"SavedVariables file not found: {self.savedvariables_path}")
+            if not path.exists():
+                logger.warning(f"SavedVariables file not found: {path}")
                 return None
 
-            # Check file modification time — skip if unchanged
-            try:
-                mtime = self.savedvariables_path.stat().st_mtime
-            except OSError:
-                mtime = 0
-
-            if mtime == self._last_mtime:
-                return None  # File unchanged, skip
-            self._last_mtime = mtime
-
-            with open(self.savedvariables_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            queue = LuaParser.extract_discord_queue(content)
-            return queue
+            return self.readers[path].read()
 
         except PermissionError:
-            logger.debug("SavedVariables file locked (WoW writing), will retry")
+            logger.debug(f"SavedVariables file locked (WoW writing {account_name(path)}), will retry")
             return None
         except Exception as e:
-            logger.error(f"Error reading SavedVariables: {e}")
+            logger.error(f"Error reading SavedVariables {path}: {e}")
             return None
 
-    def process_queue(self):
-        """Process Discord event queue"""
-        try:
-            queue = self.extract_queue()
-            if not queue:
-                return
-
-            # Filter events newer than last processed
-            pending_events = [
-                event for event in queue
-                if isinstance(event, dict) and event.get('timestamp', 0) > self.last_processed_timestamp
-            ]
-
-            if not pending_events:
-                return
+    def extract_queues(self) -> List[tuple]:
+        """(path, queue) for every watched file whose queue was read"""
+        queues = []
+        for path in self.savedvariables_paths:
+            queue = self.extract_queue(path)
+            if queue:
+                queues.append((path, queue))
+        return queues
+
+    def record_queue(self, queue: list, source: Path) -> int:
+        """Add the events of a queue read from `source` to the outbox;
+        returns how many are new"""
+        checkpoint = self._import_checkpoint if source in self._import_pending else 0
+        self._import_pending.discard(source)
+        return self.outbox.add(queue, delivered_up_to=checkpoint, source=str(source))
+
+    def _delivered(self, events: List[Dict[str, Any]]):
+        """Record a delivered message's events"""
+        self.outbox.mark_delivered(events)
+        newest = max(e.get('timestamp', 0) for e in events)
+        with self._state_lock:
+            if newest > self.last_processed_timestamp:
+                self.last_processed_timestamp = newest
+            self.save_state()
+
+    def deliver(self, pending_events: List[Dict[str, Any]],
+                sender: Optional['DiscordWebhookSender'] = None, priority: bool = False) -> bool:
+        """Send pending outbox events through one destination's sender
+        (default webhook if not given), marking each delivered message.
+        Priority events are sent one per message with the reserved
+        rate-limit capacity. Returns False if a send failed (the rest
+        stays pending)."""
+        sender = sender or self.sender
+        name = self.destination_names[sender.webhook_url]
+
+        if priority:
+            logger.info(f"Processing {len(pending_events)} priority events for {name}")
+            for event in pending_events:
+                if not sender.send_events([event], priority=True):
+                    logger.warning(f"Priority send to {name} failed, will retry")
+                    return False
+                self._delivered([event])
+            return True
 
-            # Sort by timestamp to process in order
-            pending_events.sort(key=lambda e: e.get('timestamp', 0))
+        logger.info(f"Processing {len(pending_events)} pending events for {name} (summary_mode={self.summary_mode})")
 
-            logger.info(f"Processing {len(pending_events)} pending events (summary_mode={self.summary_mode})")
+        # Large backlog: one message with the events as an attached file
+        if self.use_bulk(pending_events):
+            success = sender.send_bulk(pending_events, self.config['bulk_format'])
+            if success:
+                self._delivered(pending_events)
+                return True
+            if success is not None:
+                logger.warning(f"Bulk send to {name} failed, will retry")
+                return False
 
-            # Summary mode: group all events into one embed
-            if self.summary_mode and len(pending_events) > 1:
+        # Summary mode: group the events into summaries of at most batch_max_events
+        if self.summary_mode and len(pending_events) > 1:
+            for batch in self.summary_batches(pending_events):
                 try:
-                    success = self.sender.send_summary(pending_events)
+                    success = sender.send_summary(batch, on_sent=self._delivered)
                 except Exception as e:
                     logger.error(f"Exception sending summary: {e}")
                     success = False
 
-                if success:
-                    self.last_processed_timestamp = max(
-                        e.get('timestamp', 0) for e in pending_events
-                    )
-                    self.save_state()
-                else:
-                    logger.warning("Summary send failed, will retry")
+                if not success:
+                    logger.warning(f"Summary send to {name} failed, will retry")
+                    return False
+            return True
+
+        # Individual mode: one embed per event, packed up to 10 per message
+        for pack in sender.pack_events(pending_events):
+            try:
+                success = sender.send_events(pack)
+            except Exception as e:
+                logger.error(f"Exception sending {len(pack)} events: {e}")
+                success = False
+
+            if success:
+                self._delivered(pack)
             else:
-                # Individual mode: send events one by one
-                for event in pending_events:
-                    try:
-                        success = self.sender.send_event(event)
-                    except Exception as e:
-                        logger.error(f"Exception sending event {event.get('eventType', '?')}: {e}")
-                        success = False
-
-                    if success:
-                        # Update last processed timestamp
-                        event_ts = event.get('timestamp', 0)
-                        if event_ts > self.last_processed_timestamp:
-                            self.last_processed_timestamp = event_ts
-                        self.save_state()
-
-                        # Add delay between webhooks
-                        time.sleep(self.config['rate_limit_delay'])
-                    else:
-                        # Stop processing on failure (will retry on next check)
-                        logger.warning("Stopping queue processing due to send failure, will retry")
-                        break
-        except Exception as e:
-            logger.error(f"Unexpected error in process_queue: {e}")
+                # Stop processing on failure (will retry on next check)
+                logger.warning(f"Stopping queue processing for {name} due to send failure, will retry")
+                return False
+        return True
+
+    def warm_start(self):
+        """Restore parsed state from the snapshot cache, or parse the files and
+        rebuild their snapshots. The first queue check then finds the queue
+        hashes unchanged and skips parsing."""
+        for path in self.savedvariables_paths:
+            self._warm_start_file(path)
+
+    def _warm_start_file(self, path: Path):
+        start = time.perf_counter()
+        reader = self.readers[path]
+        snapshot = self.snapshots[path].load(path)
+        if snapshot:
+            reader.restore_state(snapshot['state'])
+            elapsed = (time.perf_counter() - start) * 1000
+            logger.info(f"Startup {account_name(path)}: warm (snapshot), "
+                        f"{len(reader.tail.events)} queued events in {elapsed:.1f} ms")
+            return
+
+        if not path.exists():
+            return
+        self.extract_queue(path)
+        reader.last_mtime = 0  # Let the first check pick up the parsed queue
+        elapsed = (time.perf_counter() - start) * 1000
+        logger.info(f"Startup {account_name(path)}: cold (parsed), "
+                    f"{len(reader.tail.events)} queued events in {elapsed:.1f} ms")
+        self._save_snapshot(path)
+
+    def _save_snapshot(self, path: Path):
+        if path.exists():
+            self.snapshots[path].save(path, self.readers[path].export_state())
+
+    def save_snapshot(self):
+        for path in self.savedvariables_paths:
+            self._save_snapshot(path)
+
+    def shutdown(self):
+        logger.info("Shutting down...")
+        stopped = True
+        if self.pipeline:
+            stopped = self.pipeline.stop()
+            self.pipeline.log_stats()
+        for reader in self.readers.values():
+            reader.log_stats()
+        for sender in self.senders.values():
+            sender.rate_limiter.log_stats()
+        self.http.log_latency()
+        self.rio_cache.log_stats()
+        if self.rio_breaker.skipped:
+            logger.info(f"Raider.io: {self.rio_breaker.skipped} lookups skipped while unavailable")
+        if self.outbox.duplicates:
+            logger.info(f"Outbox: {self.outbox.duplicates} guild events already seen from another account")
+        pending = self.outbox.pending_count()
+        if pending:
+            logger.info(f"Outbox: {pending} events not delivered yet, will be sent on next start")
+        self.save_snapshot()
+        if not stopped:
+            # A delivery thread still uses them; it dies with the process and
+            # its events stay pending in the outbox
+            logger.warning("Delivery still in progress, exiting without closing connections")
+            return
+        for sender in self.senders.values():
+            sender.close()
+        self.http.close()
+        self.rio_cache.close()
+        self.outbox.close()
 
     def run_polling(self):
         """Run in polling mode (check file periodically)"""
+        self.warm_start()
         logger.info("Starting polling mode")
-        logger.info(f"Watching: {self.savedvariables_path}")
-        logger.info(f"Webhook: {self.config['webhook_url'][:50]}...")
+        self.log_targets()
         logger.info(f"Check interval: {self.config['check_interval']}s")
         logger.info(f"Summary mode: {self.summary_mode}")
         logger.info(f"Last processed timestamp: {self.last_processed_timestamp}")
+        logger.info(f"Outbox: {self.outbox.pending_count()} events pending delivery")
 
-        consecutive_errors = 0
-        while True:
-            try:
-                self.process_queue()
-                consecutive_errors = 0
-                time.sleep(self.config['check_interval'])
-            except KeyboardInterrupt:
-                logger.info("Shutting down...")
-                break
-            except Exception as e:
-                consecutive_errors += 1
-                logger.error(f"Error in polling loop ({consecutive_errors}): {e}")
-                # Back off on repeated errors to avoid spinning
-                backoff = min(self.config['check_interval'] * consecutive_errors, 60)
-                time.sleep(backoff)
+        self.pipeline = DeliveryPipeline(self, max_batches=self.config['pipeline_queue_size'])
+        self.pipeline.start()
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            self.shutdown()
 
     def run_watching(self):
         """Run in file watching mode (requires watchdog)"""
@@ -1041,43 +3264,186 @@ class DiscordWebhookBot:
             logger.warning("Watchdog not available, falling back to polling mode")
             return self.run_polling()
 
+        self.warm_start()
         logger.info("Starting file watching mode")
-        logger.info(f"Watching: {self.savedvariables_path}")
-        logger.info(f"Webhook: {self.config['webhook_url'][:50]}...")
-
-        # Process existing queue on startup
-        self._last_mtime = 0  # Force parse on startup
-        self.process_queue()
+        self.log_targets()
 
-        # Watch for file changes
-        def on_change():
-            self._last_mtime = 0  # Reset mtime so extract_queue re-reads
-            self.process_queue()
+        # Parsing and delivery run on the pipeline threads; file changes only wake the parser
+        self.pipeline = DeliveryPipeline(self, max_batches=self.config['pipeline_queue_size'])
+        self.pipeline.start()
 
-        event_handler = SavedVariablesWatcher(on_change)
+        # One observer for every account's SavedVariables directory
+        event_handler = SavedVariablesWatcher(self.pipeline.notify, self.savedvariables_paths)
         observer = Observer()
-        observer.schedule(
-            event_handler,
-            str(self.savedvariables_path.parent),
-            recursive=False
-        )
+        for directory in event_handler.directories:
+            if os.path.isdir(directory):
+                observer.schedule(event_handler, directory, recursive=False)
+            else:
+                logger.warning(f"Cannot watch missing directory {directory}")
         observer.start()
 
         try:
             while True:
                 time.sleep(1)
         except KeyboardInterrupt:
-            logger.info("Shutting down...")
+            self.shutdown()
             observer.stop()
         observer.join()
 
+    # ── asyncio mode ─────────────────────────────────────────────────
+
+    async def run_async(self):
+        """Run as cooperating asyncio tasks (--async).
+
+        The watch task reacts to file changes (watchdog, or polling every
+        check_interval) and parses the queue in an executor; new events go
+        to the batch queue of their webhook, drained by that webhook's
+        delivery task, which enriches and sends them with async rate
+        limiting. A slow Raider.io lookup or a 429 therefore never delays
+        change detection or the other webhooks.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.warm_start)
+        logger.info("Starting asyncio mode")
+        self.log_targets()
+        logger.info(f"Summary mode: {self.summary_mode}")
+
+        lanes: Dict[tuple, asyncio.Queue] = {(url, priority): asyncio.Queue()
+                                             for url in self.senders for priority in (True, False)}
+        changed = asyncio.Event()
+        changed.set()  # Process existing queue on startup
+
+        observer = None
+        if WATCHDOG_AVAILABLE:
+            handler = SavedVariablesWatcher(lambda path: loop.call_soon_threadsafe(changed.set),
+                                            self.savedvariables_paths)
+            observer = Observer()
+            for directory in handler.directories:
+                if os.path.isdir(directory):
+                    observer.schedule(handler, directory, recursive=False)
+            observer.start()
+
+        self._queued_ids = {key: set() for key in lanes}
+        tasks = [loop.create_task(self._watch_async(changed, lanes))]
+        tasks += [loop.create_task(self._deliver_async(batches, self.senders[url], priority))
+                  for (url, priority), batches in lanes.items()]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            if observer:
+                observer.stop()
+                observer.join()
+
+    async def _watch_async(self, changed: asyncio.Event, lanes: Dict[tuple, asyncio.Queue]):
+        interval = self.config['check_interval']
+        consecutive_errors = 0
+        while True:
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass  # Poll anyway: the mtime check is cheap
+            if changed.is_set():
+                changed.clear()
+                self.force_read()
+            try:
+                await self._watch_pass(lanes)
+                consecutive_errors = 0
+            except Exception as e:
+                consecutive_errors += 1
+                logger.error(f"Error in watch task ({consecutive_errors}): {e}")
+                # Back off on repeated errors to avoid spinning
+                await asyncio.sleep(min(interval * consecutive_errors, 60))
+
+    async def _watch_pass(self, lanes: Dict[tuple, asyncio.Queue]):
+        loop = asyncio.get_running_loop()
+        for path, queue in await loop.run_in_executor(None, self.extract_queues):
+            await loop.run_in_executor(None, self.record_queue, queue, path)
+        pending = await loop.run_in_executor(None, self.outbox.pending)
+        for key, events in self.route_events(pending).items():
+            queued = self._queued_ids[key]
+            events = [e for e in events if e['_outbox_id'] not in queued]
+            # The delivery task may have sent some while pending() ran in the
+            # executor; check again without yielding to it
+            events = self.outbox.still_pending(events)
+            if events:
+                queued.update(e['_outbox_id'] for e in events)
+                await lanes[key].put(events)
+
+    async def _deliver_async(self, batches: asyncio.Queue, sender: 'DiscordWebhookSender',
+                             priority: bool = False):
+        loop = asyncio.get_running_loop()
+        name = self.destination_names[sender.webhook_url]
+        queued = self._queued_ids[(sender.webhook_url, priority)]
+
+        while True:
+            pending = await batches.get()
+            try:
+                if self.summary_mode and not priority:
+                    # Batching window, as in DeliveryLane._collect
+                    deadline = loop.time() + self.config['batch_linger']
+                    while not self.batch_full(pending, sender) and deadline > loop.time():
+                        try:
+                            pending = pending + await asyncio.wait_for(batches.get(), deadline - loop.time())
+                        except asyncio.TimeoutError:
+                            break
+                success = await self._deliver_batch_async(pending, sender, priority)
+            except Exception as e:
+                logger.error(f"Error in delivery task {name}: {e}")
+                success = False
+
+            if success:
+                queued.difference_update(e['_outbox_id'] for e in pending)
+                continue
+            # Drop later batches: the next check re-queues everything still pending, in order
+            logger.warning(f"Send to {name} failed, will retry on next check")
+            while not batches.empty():
+                batches.get_nowait()
+            queued.clear()
+            await asyncio.sleep(self.config['check_interval'])
+
+    async def _deliver_batch_async(self, pending: List[Dict[str, Any]], sender: 'DiscordWebhookSender',
+                                   priority: bool) -> bool:
+        """deliver() for the asyncio mode; rate-limit waits only suspend the task"""
+        name = self.destination_names[sender.webhook_url]
+
+        logger.info(f"Processing {len(pending)} {'priority' if priority else 'pending'} events for {name} "
+                    f"(summary_mode={self.summary_mode})")
+
+        if priority:
+            for event in pending:
+                if not await sender.send_events_async([event], priority=True):
+                    return False
+                self._delivered([event])
+            return True
+
+        if self.use_bulk(pending):
+            bulk = await sender.send_bulk_async(pending, self.config['bulk_format'])
+            if bulk:
+                self._delivered(pending)
+            if bulk is not None:
+                return bulk
+
+        if self.summary_mode and len(pending) > 1:
+            for batch in self.summary_batches(pending):
+                if not await sender.send_summary_async(batch, on_sent=self._delivered):
+                    return False
+            return True
+
+        for pack in sender.pack_events(pending):
+            if not await sender.send_events_async(pack):
+                return False
+            self._delivered(pack)
+        return True
+
     def run(self):
         """Run the bot (polling mode - most compatible)"""
-        self._last_mtime = 0  # Force parse on first poll
+        self.force_read()  # Force parse on first poll
         self.run_polling()
 
 
-def test_webhook(webhook_url: str):
+def test_webhook(webhook_url: str, http: Optional[HttpClient] = None):
     """Send a test message to Discord webhook"""
     logger.info("Sending test webhook...")
 
@@ -1109,7 +3475,7 @@ def test_webhook(webhook_url: str):
     }
 
     try:
-        response = requests.post(webhook_url, json=payload, timeout=10)
+        response = (http or HttpClient()).post_json(webhook_url, HttpClient.dumps(payload))
         if response.status_code == 204:
             logger.info("Test webhook sent successfully!")
             return True
@@ -1121,13 +3487,146 @@ def test_webhook(webhook_url: str):
         return False
 
 
+def build_synthetic_savedvariables(target_bytes: int, queue_events: int = 100) -> str:
+    """Build a SavedVariables file shaped like CelestialRecruiterDB, padded
+    with contacts/logs until it reaches roughly target_bytes"""
+    classes = ["Mage", "Chamane", "Druide", "Paladin", "Guerrier", "Evocateur"]
+    statuses = ["new", "contacted", "invited", "joined", "ignored"]
+
+    def contact(i: int) -> str:
+        return (
+            f'\t\t\t["Joueur{i}-KhazModan"] = {{\n'
+            f'\t\t\t\t["name"] = "Joueur{i}-KhazModan",\n'
+            f'\t\t\t\t["status"] = "{statuses[i % len(statuses)]}",\n'
+            f'\t\t\t\t["level"] = {70 + i % 11},\n'
+            f'\t\t\t\t["classLabel"] = "{classes[i % len(classes)]}",\n'
+            f'\t\t\t\t["race"] = "Draenei",\n'
+            f'\t\t\t\t["zone"] = "Dornogal",\n'
+            f'\t\t\t\t["firstSeen"] = {1700000000 + i},\n'
+            f'\t\t\t\t["optedIn"] = {"true" if i % 3 == 0 else "false"},\n'
+            f'\t\t\t\t["score"] = {i % 100}.5,\n'
+            f'\t\t\t\t["notes"] = "Vu pres de l\'\\"hotel\\" des ventes",\n'
+            f'\t\t\t\t["tags"] = {{\n\t\t\t\t\t"raid", -- [1]\n\t\t\t\t\t"mplus", -- [2]\n\t\t\t\t}},\n'
+            f'\t\t\t}},\n'
+        )
+
+    def log(i: int) -> str:
+        return (
+            f'\t\t\t{{\n\t\t\t\t["t"] = {1700000000 + i},\n'
+            f'\t\t\t\t["kind"] = "OUT",\n'
+            f'\t\t\t\t["text"] = "Message envoye a Joueur{i}",\n'
+            f'\t\t\t}}, -- [{i + 1}]\n'
+        )
+
+    def event(i: int) -> str:
+        return (
+            f'\t\t\t{{\n\t\t\t\t["timestamp"] = {1700000000 + i},\n'
+            f'\t\t\t\t["eventType"] = "player_whispered",\n'
+            f'\t\t\t\t["title"] = "Message envoye",\n'
+            f'\t\t\t\t["description"] = "Message envoye a **Joueur{i}-KhazModan**",\n'
+            f'\t\t\t\t["color"] = 3447003,\n'
+            f'\t\t\t\t["fields"] = {{\n'
+            f'\t\t\t\t\t{{\n\t\t\t\t\t\t["name"] = "Classe",\n'
+            f'\t\t\t\t\t\t["value"] = "{classes[i % len(classes)]}",\n'
+            f'\t\t\t\t\t\t["inline"] = true,\n\t\t\t\t\t}}, -- [1]\n'
+            f'\t\t\t\t}},\n\t\t\t}}, -- [{i + 1}]\n'
+        )
+
+    parts = ['\nCelestialRecruiterDB = {\n\t["global"] = {\n\t\t["discordQueue"] = {\n']
+    parts.extend(event(i) for i in range(queue_events))
+    parts.append('\t\t},\n\t\t["contacts"] = {\n')
+    size = sum(len(p) for p in parts)
+    contact_budget = target_bytes * 3 // 4
+    i = 0
+    while size < contact_budget:
+        chunk = contact(i)
+        parts.append(chunk)
+        size += len(chunk)
+        i += 1
+    parts.append('\t\t},\n\t\t["logs"] = {\n')
+    i = 0
+    while size < target_bytes:
+        chunk = log(i)
+        parts.append(chunk)
+        size += len(chunk)
+        i += 1
+    parts.append('\t\t},\n\t},\n\t["profileKeys"] = {\n\t\t["Plume - KhazModan"] = "Default",\n\t},\n}\n')
+    return ''.join(parts)
+
+
+def benchmark_parser(sizes_mb: List[float], workers: int = 1):
+    """Time the full parse on synthetic files to check linear scaling, and
+    the mmap queue read, which should stay flat whatever the file size.
+    With workers > 1 the process-pool parse is timed as well."""
+    logger.info("Benchmarking LuaParser.parse_savedvariables")
+    parallel_col = f" {f'x{workers} procs':>10}" if workers > 1 else ""
+    logger.info(f"{'size':>9} {'parse':>9} {'MB/s':>7} {'s/MB':>7} {'queue':>9}{parallel_col}")
+    per_mb = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'CelestialRecruiterDB.lua'
+        for size_mb in sizes_mb:
+            content = build_synthetic_savedvariables(int(size_mb * 1024 * 1024))
+            path.write_text(content, encoding='utf-8')
+            start = time.perf_counter()
+            LuaParser.parse_savedvariables(content)
+            elapsed = time.perf_counter() - start
+            actual_mb = len(content) / (1024 * 1024)
+            parallel = ""
+            if workers > 1:
+                start = time.perf_counter()
+                LuaParser.parse_savedvariables_parallel(content, workers)
+                parallel = f" {time.perf_counter() - start:>9.2f}s"
+            del content
+
+            start = time.perf_counter()
+            with mapped_file(path) as buf:
+                LuaParser.extract_discord_queue(buf)
+            queue_ms = (time.perf_counter() - start) * 1000
+
+            per_mb.append(elapsed / actual_mb)
+            logger.info(f"{actual_mb:>7.1f}MB {elapsed:>8.2f}s {actual_mb / elapsed:>7.2f} "
+                        f"{elapsed / actual_mb:>7.3f} {queue_ms:>7.1f}ms{parallel}")
+    if len(per_mb) > 1:
+        # Linear parsing keeps the cost per MB flat as the file grows
+        logger.info(f"Cost per MB, largest vs smallest file: x{per_mb[-1] / per_mb[0]:.2f} (1.00 = linear)")
+
+
+def export_json(config_path: str, output: str, workers: Optional[int] = None):
+    """Fully parse the configured SavedVariables file(s) and dump them as JSON.
+    With several files the output maps each path to its tables."""
+    if not Path(config_path).exists():
+        logger.error(f"Config file not found: {config_path}")
+        sys.exit(1)
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+    paths = resolve_savedvariables(config.get('savedvariables_path', ''))
+    for path in paths:
+        if not path.is_file():
+            logger.error(f"SavedVariables file not found: {path}")
+            sys.exit(1)
+    if not paths:
+        logger.error("No SavedVariables file configured")
+        sys.exit(1)
+
+    workers = workers or config.get('parse_workers', 1)
+    parsed = {}
+    for path in paths:
+        start = time.perf_counter()
+        parsed[str(path)] = LuaParser.parse_file(path, workers)
+        logger.info(f"Parsed {path.name} ({account_name(path)}) in {time.perf_counter() - start:.2f}s "
+                    f"({workers} worker(s))")
+    data = parsed.popitem()[1] if len(parsed) == 1 else parsed
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    logger.info(f"Wrote {output}")
+
+
 def create_default_config():
     """Create a default config.json template"""
     default_config = {
         "savedvariables_path": "C:\\Program Files (x86)\\World of Warcraft\\_retail_\\WTF\\Account\\YOUR_ACCOUNT\\SavedVariables\\CelestialRecruiterDB.lua",
         "webhook_url": "https://discord.com/api/webhooks/YOUR_WEBHOOK_ID/YOUR_WEBHOOK_TOKEN",
         "check_interval": 5,
-        "rate_limit_delay": 2,
         "summary_mode": True
     }
 
@@ -1164,6 +3663,30 @@ def main():
         action='store_true',
         help='Create a default config.json template'
     )
+    parser.add_argument(
+        '--async',
+        dest='use_async',
+        action='store_true',
+        help='Run the asyncio runtime (watching, parsing and delivery as concurrent tasks)'
+    )
+    parser.add_argument(
+        '--benchmark-parser',
+        nargs='*',
+        type=float,
+        metavar='MB',
+        help='Benchmark the SavedVariables parser on synthetic files (default sizes: 1 5 10 25 50 MB)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        metavar='N',
+        help='Worker processes for full SavedVariables parses (overrides parse_workers in config)'
+    )
+    parser.add_argument(
+        '--export-json',
+        metavar='PATH',
+        help='Fully parse the configured SavedVariables file, write it as JSON and exit'
+    )
 
     args = parser.parse_args()
 
@@ -1171,6 +3694,10 @@ def main():
         create_default_config()
         return
 
+    if args.benchmark_parser is not None:
+        benchmark_parser(sorted(args.benchmark_parser) or [1, 5, 10, 25, 50], args.workers or 1)
+        return
+
     if args.test:
         config_path = args.config
         if not Path(config_path).exists():
@@ -1188,8 +3715,18 @@ def main():
         test_webhook(webhook_url)
         return
 
+    if args.export_json:
+        export_json(args.config, args.export_json, args.workers)
+        return
+
     # Run the bot
     bot = DiscordWebhookBot(args.config)
+    if args.use_async:
+        try:
+            asyncio.run(bot.run_async())
+        except KeyboardInterrupt:
+            bot.shutdown()
+        return
     bot.run()
 
 